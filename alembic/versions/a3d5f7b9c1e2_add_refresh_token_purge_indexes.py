@@ -0,0 +1,40 @@
+"""Add refresh token purge indexes
+
+Revision ID: a3d5f7b9c1e2
+Revises: f5c1a7e9b3d2
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d5f7b9c1e2'
+down_revision: Union[str, Sequence[str], None] = 'f5c1a7e9b3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_refresh_tokens_expires_at',
+        'refresh_tokens',
+        ['expires_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_refresh_tokens_revoked_rotated_at',
+        'refresh_tokens',
+        ['revoked', 'rotated_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_revoked_rotated_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: c4e8d2f1a9b7
+Revises: b3c2a1d4f5e6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8d2f1a9b7'
+down_revision: Union[str, Sequence[str], None] = 'b3c2a1d4f5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_roles_created_at_id', 'roles', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_roles_created_at_id', table_name='roles')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,103 @@
+"""Convert primary and foreign key ids to BINARY(16)
+
+Only applied on MySQL with ID_STORAGE=binary; otherwise this revision is a
+no-op so deployments that keep string ids stay on VARCHAR(36). Alembic
+records the revision as applied either way, and the application checks the
+live id column type against ID_STORAGE at startup and refuses to run on a
+mismatch.
+
+Run alembic with the same ID_STORAGE the application uses. To switch an
+existing database (both directions), with the application stopped and a
+backup taken:
+
+    ID_STORAGE=<current> alembic downgrade c4e8d2f1a9b7
+    ID_STORAGE=<new> alembic upgrade head
+
+The downgrade undoes the later revisions too: their indexes are rebuilt,
+and refresh-token digests round-trip through token_hash (f5c1a7e9b3d2).
+Then start the application with ID_STORAGE=<new>.
+
+Revision ID: d7a3b9e2c5f1
+Revises: c4e8d2f1a9b7
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Dict, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from src.config.settings import get_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3b9e2c5f1'
+down_revision: Union[str, Sequence[str], None] = 'c4e8d2f1a9b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ID_COLUMNS: Dict[str, List[str]] = {
+    'roles': ['id'],
+    'users': ['id', 'role_id'],
+    'refresh_tokens': ['id', 'user_id', 'rotated_from'],
+}
+NULLABLE_COLUMNS = {('users', 'role_id'), ('refresh_tokens', 'rotated_from')}
+FOREIGN_KEYS = [
+    ('fk_users_role_id_roles', 'users', 'role_id', 'roles'),
+    ('fk_refresh_tokens_user_id_users', 'refresh_tokens', 'user_id', 'users'),
+    ('fk_refresh_tokens_rotated_from', 'refresh_tokens', 'rotated_from', 'refresh_tokens'),
+]
+KEYSET_INDEXES = [
+    ('ix_users_created_at_id', 'users'),
+    ('ix_roles_created_at_id', 'roles'),
+]
+
+
+def _enabled() -> bool:
+    return get_settings().id_storage == 'binary' and op.get_bind().dialect.name == 'mysql'
+
+
+def _convert(new_type, convert_sql: str) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in ID_COLUMNS:
+        for fk in inspector.get_foreign_keys(table):
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+    for name, table in KEYSET_INDEXES:
+        op.drop_index(name, table_name=table)
+
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            nullable = (table, column) in NULLABLE_COLUMNS
+            tmp = f'{column}_tmp'
+            op.add_column(table, sa.Column(tmp, new_type, nullable=True))
+            op.execute(f'UPDATE {table} SET {tmp} = {convert_sql.format(column=column)}')
+            op.drop_column(table, column)
+            op.alter_column(
+                table,
+                tmp,
+                new_column_name=column,
+                existing_type=new_type,
+                nullable=nullable,
+            )
+        op.create_primary_key(f'pk_{table}', table, ['id'])
+
+    for name, table in KEYSET_INDEXES:
+        op.create_index(name, table, ['created_at', 'id'], unique=False)
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referred, [column], ['id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _enabled():
+        return
+    _convert(mysql.BINARY(length=16), 'UUID_TO_BIN({column})')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _enabled():
+        return
+    _convert(mysql.VARCHAR(length=36), 'BIN_TO_UUID({column})')
@@ -0,0 +1,33 @@
+"""Add refresh token revocation index
+
+Revision ID: e2b6c8d4a1f3
+Revises: d7a3b9e2c5f1
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6c8d4a1f3'
+down_revision: Union[str, Sequence[str], None] = 'd7a3b9e2c5f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_refresh_tokens_user_device_revoked',
+        'refresh_tokens',
+        ['user_id', 'device_id', 'revoked'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_user_device_revoked', table_name='refresh_tokens')
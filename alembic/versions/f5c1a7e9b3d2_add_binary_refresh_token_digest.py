@@ -0,0 +1,58 @@
+"""Add binary refresh token digest
+
+Adds refresh_tokens.token_digest (BINARY(32)) next to the hex token_hash
+for the TOKEN_HASH_STORAGE=binary dual-read period. Existing hex hashes
+are backfilled only when binary storage is enabled.
+
+Revision ID: f5c1a7e9b3d2
+Revises: e2b6c8d4a1f3
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from src.config.settings import get_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c1a7e9b3d2'
+down_revision: Union[str, Sequence[str], None] = 'e2b6c8d4a1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('token_digest', mysql.BINARY(length=32), nullable=True))
+    op.create_index(op.f('ix_refresh_tokens_token_digest'), 'refresh_tokens', ['token_digest'], unique=True)
+    op.alter_column(
+        'refresh_tokens',
+        'token_hash',
+        existing_type=mysql.VARCHAR(length=128),
+        nullable=True,
+    )
+    if get_settings().token_hash_storage == 'binary':
+        op.execute(
+            'UPDATE refresh_tokens SET token_digest = UNHEX(token_hash) '
+            'WHERE token_digest IS NULL AND token_hash IS NOT NULL'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        'UPDATE refresh_tokens SET token_hash = LOWER(HEX(token_digest)) '
+        'WHERE token_hash IS NULL AND token_digest IS NOT NULL'
+    )
+    op.alter_column(
+        'refresh_tokens',
+        'token_hash',
+        existing_type=mysql.VARCHAR(length=128),
+        nullable=False,
+    )
+    op.drop_index(op.f('ix_refresh_tokens_token_digest'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token_digest')
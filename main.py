@@ -1,5 +1,17 @@
+import asyncio
+
 from fastapi import FastAPI, HTTPException
-from src.config.settings import init_db
+from src.config.logger import get_logger
+from src.config.settings import dispose_async_engine, get_engine, get_settings, init_db
+from src.models.base.identifiers import verify_id_storage
+from src.jobs.token_filter import rebuild_refresh_token_filter
+from src.jobs.token_purge import run_token_purge_loop
+from src.stores.token.kv_client import close_kv_client
+from src.utils.password_hasher import get_password_hashing_pool, shutdown_password_hashing_pool
+from src.metrics.exporter import discard_metrics, run_metrics_flush_loop
+from src.middleware.metrics_middleware import MetricsMiddleware
+from src.middleware.query_stats_middleware import QueryStatsMiddleware
+from src.middleware.request_id_middleware import RequestIdMiddleware
 from src.routes import register_routes
 from src.exceptions.base_exception import BaseServiceException
 from src.utils.exception_handlers import (
@@ -17,6 +29,22 @@ def create_app() -> FastAPI:
         description="API for validating and managing articles",
     )
 
+    settings = get_settings()
+    if settings.sql_instrumentation:
+        fastapi_app.add_middleware(
+            QueryStatsMiddleware,
+            n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+            debug_headers=settings.sql_debug_headers,
+        )
+    if settings.metrics_enabled:
+        fastapi_app.add_middleware(MetricsMiddleware)
+        if not settings.metrics_bearer_token:
+            get_logger("Metrics").warning(
+                "/metrics is served without authentication; set METRICS_BEARER_TOKEN "
+                "or keep the path off the public listener"
+            )
+    fastapi_app.add_middleware(RequestIdMiddleware)
+
     fastapi_app.add_exception_handler(BaseServiceException, service_exception_handler)
     fastapi_app.add_exception_handler(HTTPException, http_exception_handler)
     fastapi_app.add_exception_handler(Exception, general_exception_handler)
@@ -25,6 +53,51 @@ def create_app() -> FastAPI:
     def _init_db_on_startup() -> None:
         """Initialize the database on application startup."""
         init_db()
+        verify_id_storage(get_engine())
+
+    @fastapi_app.on_event("startup")
+    async def _prime_dummy_hash() -> None:
+        """Hash the unknown-user dummy password before the first login."""
+        await get_password_hashing_pool().dummy_hash()
+
+    @fastapi_app.on_event("startup")
+    async def _rebuild_token_filter() -> None:
+        """Seed the revoked refresh token filter from the database."""
+        await rebuild_refresh_token_filter()
+
+    @fastapi_app.on_event("startup")
+    async def _start_token_purge() -> None:
+        """Schedule the periodic refresh token purge."""
+        fastapi_app.state.token_purge_task = None
+        settings = get_settings()
+        if settings.token_store == "sql" and settings.refresh_token_purge_interval_seconds > 0:
+            fastapi_app.state.token_purge_task = asyncio.create_task(run_token_purge_loop())
+
+    @fastapi_app.on_event("startup")
+    async def _start_metrics_flush() -> None:
+        """Publish this worker's metrics for multiprocess aggregation."""
+        fastapi_app.state.metrics_flush_task = None
+        settings = get_settings()
+        if settings.metrics_enabled and settings.metrics_multiproc_dir:
+            fastapi_app.state.metrics_flush_task = asyncio.create_task(run_metrics_flush_loop())
+
+    @fastapi_app.on_event("shutdown")
+    async def _dispose_db_on_shutdown() -> None:
+        """Release pooled async database connections on shutdown."""
+        for name in ("token_purge_task", "metrics_flush_task"):
+            task = getattr(fastapi_app.state, name, None)
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if fastapi_app.state.metrics_flush_task is not None:
+            await asyncio.to_thread(discard_metrics)
+        await dispose_async_engine()
+        await close_kv_client()
+        shutdown_password_hashing_pool()
 
     register_routes(fastapi_app)
 
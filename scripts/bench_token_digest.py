@@ -0,0 +1,167 @@
+"""Compare refresh-token lookups on a hex String(128) key and a BINARY(32) key.
+
+Builds two single-index tables with the same N token hashes, then reports
+the size of each unique index and point-lookup latency for hits and misses:
+
+    python scripts/bench_token_digest.py --rows 10000000 --url mysql+pymysql://...
+
+Defaults to a throwaway SQLite file. Index sizes come from dbstat on
+SQLite and mysql.innodb_index_stats on MySQL; other dialects report
+latency only.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import (
+    BINARY, Column, Integer, MetaData, String, Table, bindparam, create_engine, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+metadata = MetaData()
+
+hex_tokens = Table(
+    "bench_token_hex",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("token_hash", String(128), nullable=False),
+)
+binary_tokens = Table(
+    "bench_token_binary",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("token_digest", BINARY(32), nullable=False),
+)
+INDEXES = {
+    "hex": ("bench_token_hex", "ux_bench_token_hex", "token_hash"),
+    "binary": ("bench_token_binary", "ux_bench_token_binary", "token_digest"),
+}
+
+
+def _digest(i: int) -> bytes:
+    return hashlib.sha256(f"bench-token-{i}".encode()).digest()
+
+
+def _key(mode: str, i: int):
+    digest = _digest(i)
+    return digest.hex() if mode == "hex" else digest
+
+
+def load(engine: Engine, rows: int, batch_size: int) -> None:
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    for mode, table in (("hex", hex_tokens), ("binary", binary_tokens)):
+        _, _, column = INDEXES[mode]
+        started = time.perf_counter()
+        for start in range(0, rows, batch_size):
+            batch = [
+                {"id": i, column: _key(mode, i)}
+                for i in range(start, min(rows, start + batch_size))
+            ]
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+        # Index after loading, as a backfill would; inserting random keys
+        # into a live unique index is a different (slower) benchmark.
+        with engine.begin() as conn:
+            table_name, index_name, _ = INDEXES[mode]
+            conn.execute(text(f"CREATE UNIQUE INDEX {index_name} ON {table_name} ({column})"))
+            if engine.dialect.name == "mysql":
+                conn.execute(text(f"ANALYZE TABLE {table_name}"))
+        print(f"loaded {rows} {mode} rows in {time.perf_counter() - started:.1f}s")
+
+
+def index_bytes(conn: Connection, mode: str) -> Optional[int]:
+    table_name, index_name, _ = INDEXES[mode]
+    if conn.dialect.name == "sqlite":
+        try:
+            return conn.execute(
+                text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"), {"name": index_name}
+            ).scalar()
+        except Exception:
+            return None
+    if conn.dialect.name == "mysql":
+        pages = conn.execute(
+            text(
+                "SELECT stat_value FROM mysql.innodb_index_stats WHERE database_name = DATABASE() "
+                "AND table_name = :table AND index_name = :index AND stat_name = 'size'"
+            ),
+            {"table": table_name, "index": index_name},
+        ).scalar()
+        page_size = conn.execute(text("SELECT @@innodb_page_size")).scalar()
+        return int(pages) * int(page_size) if pages is not None else None
+    return None
+
+
+def measure(conn: Connection, mode: str, ids: List[int]) -> Dict[str, float]:
+    table = hex_tokens if mode == "hex" else binary_tokens
+    column = table.c[INDEXES[mode][2]]
+    query = select(table.c.id).where(column == bindparam("key"))
+    timings: List[float] = []
+    for i in ids:
+        key = _key(mode, i)
+        started = time.perf_counter()
+        conn.execute(query, {"key": key}).first()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        "mean_us": statistics.fmean(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p99_us": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+def run(engine: Engine, rows: int, lookups: int, seed: int) -> None:
+    rng = random.Random(seed)
+    hits = [rng.randrange(rows) for _ in range(lookups)]
+    misses = [rows + rng.randrange(rows) for _ in range(lookups)]
+    with engine.connect() as conn:
+        for mode in ("hex", "binary"):
+            # Warm-up pass so both modes are measured with a hot buffer pool.
+            measure(conn, mode, hits[: max(1, lookups // 10)])
+            size = index_bytes(conn, mode)
+            hit = measure(conn, mode, hits)
+            miss = measure(conn, mode, misses)
+            size_text = f"{size / 2**20:9.1f} MiB" if size is not None else "        n/a"
+            print(
+                f"{mode:<7} index {size_text}  "
+                f"hit p50 {hit['p50_us']:7.1f}us p99 {hit['p99_us']:7.1f}us  "
+                f"miss p50 {miss['p50_us']:7.1f}us p99 {miss['p99_us']:7.1f}us"
+            )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=15)
+    parser.add_argument("--keep", action="store_true", help="keep the tables for a later --skip-load")
+    parser.add_argument("--skip-load", action="store_true", help="reuse tables from a --keep run")
+    args = parser.parse_args(argv)
+
+    path = None
+    url = args.url
+    if url is None:
+        path = os.path.join(tempfile.gettempdir(), "bench_token_digest.sqlite")
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    try:
+        if not args.skip_load:
+            load(engine, args.rows, args.batch_size)
+        run(engine, args.rows, args.lookups, args.seed)
+    finally:
+        engine.dispose()
+        if path is not None and not args.keep:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,201 @@
+import atexit
+import copy
+import json
 import logging
-from typing import Optional
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request_id",
+}
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+class LoggingSettings(BaseSettings):
+    log_format: Literal["text", "json"] = "text"
+    log_async: bool = True
+    log_queue_size: int = 10000
+    log_sample_rates: Dict[str, float] = {}
+    log_rate_limits: Dict[str, float] = {}
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+    ) -> None:
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _lookup(self, table: Dict[str, float], name: str) -> Optional[float]:
+        while name:
+            if name in table:
+                return table[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def _allow_rate(self, name: str, per_second: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(name, (per_second, now))
+            tokens = min(per_second, tokens + (now - updated) * per_second)
+            if tokens < 1:
+                self._buckets[name] = (tokens, now)
+                return False
+            self._buckets[name] = (tokens - 1, now)
+            return True
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._lookup(self.sample_rates, record.name)
+        if rate is not None and random.random() >= rate:
+            self.dropped += 1
+            return False
+        limit = self._lookup(self.rate_limits, record.name)
+        if limit is not None and not self._allow_rate(record.name, limit):
+            self.dropped += 1
+            return False
+        return True
+
+
+class RequestIdFilter(logging.Filter):
+    # Must run on the calling thread: the listener thread has its own context.
+    # Outside a request the attribute stays unset so the text format's "-"
+    # default applies.
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        if request_id is not None:
+            record.request_id = request_id
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return _dumps(payload)
+
+
+_exc_formatter = logging.Formatter()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge msg % args and render the traceback on the calling thread so
+        # mutable args are captured as they were at the log call. Extra
+        # fields stay on the record for JsonFormatter.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 class LoggerConfig:
     def __init__(
-        self, level: int = logging.INFO, handler: Optional[logging.Handler] = None
+        self,
+        level: int = logging.INFO,
+        handler: Optional[logging.Handler] = None,
+        json_format: bool = False,
+        use_queue: bool = False,
+        queue_size: int = 10000,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
     ):
         self.level = level
         if handler is None:
             handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s | %(levelname)s | %(name)s | %(msecs)03d ms | %(lineno)d | %(message)s",
-            datefmt="%d-%m-%Y %H:%M:%S",
-        )
+        if json_format:
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                "%(asctime)s | %(levelname)s | %(name)s | %(msecs)03d ms | %(lineno)d | "
+                "%(request_id)s | %(message)s",
+                datefmt="%d-%m-%Y %H:%M:%S",
+                defaults={"request_id": "-"},
+            )
         handler.setFormatter(formatter)
         handler.setLevel(level)
         self.handler = handler
+        self.sampling = SamplingFilter(sample_rates, rate_limits)
+        self.listener: Optional[QueueListener] = None
+        if use_queue:
+            self.root_handler: logging.Handler = NonBlockingQueueHandler(
+                queue.Queue(maxsize=max(0, queue_size))
+            )
+            self.listener = QueueListener(
+                self.root_handler.queue, handler, respect_handler_level=True
+            )
+        else:
+            self.root_handler = handler
+        self.root_handler.addFilter(self.sampling)
+        self.root_handler.addFilter(RequestIdFilter())
+        self.root_handler.setLevel(level)
         self._configured = False
+        self._listening = False
 
     def configure_root(self) -> None:
         root = logging.getLogger()
@@ -24,9 +203,18 @@ class LoggerConfig:
             for h in list(root.handlers):
                 root.removeHandler(h)
             root.setLevel(self.level)
-            root.addHandler(self.handler)
+            root.addHandler(self.root_handler)
+            if self.listener is not None:
+                self.listener.start()
+                self._listening = True
+                atexit.register(self.shutdown)
             self._configured = True
 
+    def shutdown(self) -> None:
+        if self.listener is not None and self._listening:
+            self.listener.stop()
+            self._listening = False
+
     def get_logger(self, name: str):
         self.configure_root()
         logger = logging.getLogger(name)
@@ -34,7 +222,18 @@ class LoggerConfig:
         return logger
 
 
-_default_config = LoggerConfig()
+def _build_default_config() -> LoggerConfig:
+    settings = LoggingSettings()
+    return LoggerConfig(
+        json_format=settings.log_format == "json",
+        use_queue=settings.log_async,
+        queue_size=settings.log_queue_size,
+        sample_rates=settings.log_sample_rates,
+        rate_limits=settings.log_rate_limits,
+    )
+
+
+_default_config = _build_default_config()
 
 
 def get_logger(name: str):
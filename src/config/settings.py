@@ -1,21 +1,82 @@
 from functools import lru_cache
-from typing import Generator
+from typing import AsyncGenerator, Generator, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import declarative_base
 
+from src.metrics.db_pool import TimedAsyncAdaptedQueuePool
+from src.metrics.slow_query_log import instrument_slow_queries
+from src.metrics.sql_instrumentation import instrument_engine
+
+
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
 
 class Settings(BaseSettings):
     database_url: str
+    async_database_url: str | None = None
     jwt_secret_key: str
     jwt_algorithm: str
     jwt_access_token_expires_minutes: int
     jwt_refresh_token_expires_days: int
     jwt_refresh_cookie_name: str | None = None
     jwt_refresh_cookie_domain: str | None = None
+    password_hash_max_workers: int = 4
+    password_hash_max_pending: int = 64
+    principal_cache_max_size: int = 1024
+    principal_cache_ttl_seconds: float = 30.0
+    login_rate_limit_backend: Literal["memory", "kv"] = "memory"
+    login_rate_limit_per_minute: float = 10.0
+    login_rate_limit_burst: int = 5
+    login_ip_rate_limit_per_minute: float = 60.0
+    login_ip_rate_limit_burst: int = 20
+    login_rate_limit_max_keys: int = 100000
+    login_backoff_after_failures: int = 5
+    login_backoff_base_seconds: float = 1.0
+    login_backoff_max_seconds: float = 900.0
+    login_failure_window_seconds: float = 900.0
+    user_import_max_rows: int = 50000
+    user_import_batch_size: int = 500
+    refresh_grace_seconds: float = 10.0
+    refresh_token_purge_interval_seconds: int = 3600
+    refresh_token_purge_retention_hours: int = 24
+    refresh_token_purge_batch_size: int = 500
+    refresh_token_purge_pause_seconds: float = 0.1
+    token_store: Literal["sql", "kv"] = "sql"
+    token_kv_url: str = "memory://"
+    token_hash_storage: Literal["hex", "binary"] = "hex"
+    token_hash_legacy_read: bool = True
+    refresh_token_filter_capacity: int = 100000
+    refresh_token_filter_error_rate: float = 0.001
+    refresh_token_missing_ttl_seconds: float = 60.0
+    refresh_token_missing_max_size: int = 10000
+    metrics_enabled: bool = True
+    metrics_bearer_token: str | None = None
+    metrics_multiproc_dir: str | None = None
+    metrics_flush_interval_seconds: float = 5.0
+    sql_instrumentation: bool = False
+    sql_debug_headers: bool = False
+    sql_n_plus_one_threshold: int = 5
+    slow_query_threshold_ms: float = 0.0
+    slow_query_explain: bool = False
+    slow_query_buffer_size: int = 200
+    id_strategy: Literal["uuid4", "uuid7"] = "uuid4"
+    id_storage: Literal["string", "binary"] = "string"
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -29,15 +90,30 @@ def get_settings() -> Settings:
     return Settings()
 
 
+def _instrument_slow_queries(engine: Engine) -> None:
+    settings = get_settings()
+    if settings.slow_query_threshold_ms > 0:
+        instrument_slow_queries(
+            engine,
+            settings.slow_query_threshold_ms,
+            settings.slow_query_explain,
+            settings.slow_query_buffer_size,
+        )
+
+
 @lru_cache
 def get_engine() -> Engine:
     settings = get_settings()
 
-    return create_engine(
+    engine = create_engine(
         settings.database_url,
         pool_pre_ping=True,
         future=True,
     )
+    if settings.sql_instrumentation:
+        instrument_engine(engine)
+    _instrument_slow_queries(engine)
+    return engine
 
 @lru_cache
 def get_sessionmaker() -> sessionmaker:
@@ -57,6 +133,54 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+def get_async_database_url() -> str:
+    settings = get_settings()
+    if settings.async_database_url:
+        return settings.async_database_url
+
+    url = make_url(settings.database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    url = get_async_database_url()
+    engine = create_async_engine(url, pool_pre_ping=True)
+    if type(engine.sync_engine.pool) is AsyncAdaptedQueuePool:
+        # Same pool, plus checkout-wait timing; nothing has connected yet.
+        engine = create_async_engine(
+            url,
+            pool_pre_ping=True,
+            poolclass=TimedAsyncAdaptedQueuePool,
+        )
+    if get_settings().sql_instrumentation:
+        instrument_engine(engine.sync_engine)
+    _instrument_slow_queries(engine.sync_engine)
+    return engine
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
 Base = declarative_base()
 
 
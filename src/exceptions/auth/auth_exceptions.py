@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+
 from src.exceptions.base_exception import BaseServiceException
 
 class InvalidCredentialsException(BaseServiceException):
@@ -20,4 +22,23 @@ class UserNotFoundInTokenException(BaseServiceException):
 
 class AdminPrivilegesRequiredException(BaseServiceException):
     def __init__(self) -> None:
-        super().__init__(message="Admin privileges required", status_code=403)
\ No newline at end of file
+        super().__init__(message="Admin privileges required", status_code=403)
+
+class PasswordHashingOverloadedException(BaseServiceException):
+    def __init__(self) -> None:
+        super().__init__(
+            message="Service temporarily overloaded",
+            status_code=503,
+            detail="Too many password operations in progress, retry shortly",
+        )
+
+class LoginThrottledException(BaseServiceException):
+    def __init__(self, retry_after: float) -> None:
+        seconds = max(1, math.ceil(retry_after))
+        super().__init__(
+            message="Too many login attempts",
+            status_code=429,
+            detail=f"Retry in {seconds} seconds",
+            headers={"Retry-After": str(seconds)},
+        )
+        self.retry_after = seconds
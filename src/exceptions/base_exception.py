@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Dict, Optional
 
 
 class BaseServiceException(Exception):
@@ -8,12 +8,14 @@ class BaseServiceException(Exception):
         self, 
         message: str, 
         status_code: int = 500, 
-        detail: Optional[str] = None
+        detail: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
     ) -> None:
         super().__init__(message)
         self.message = message
         self.status_code = status_code
         self.detail = detail or message
+        self.headers = headers
 
     def __str__(self) -> str:
         return self.message
\ No newline at end of file
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from src.exceptions.base_exception import BaseServiceException
+
+
+class InvalidCursorException(BaseServiceException):
+    def __init__(self) -> None:
+        super().__init__(message="Invalid pagination cursor", status_code=400)
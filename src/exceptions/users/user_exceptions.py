@@ -25,4 +25,13 @@ class CpfUpdateNotAllowedException(BaseServiceException):
 class RoleNotFoundForUserException(BaseServiceException):
     def __init__(self, role_id: str) -> None:
         message = f"Role with id '{role_id}' not found"
-        super().__init__(message=message, status_code=400)
\ No newline at end of file
+        super().__init__(message=message, status_code=400)
+
+class InvalidUserImportPayloadException(BaseServiceException):
+    def __init__(self, detail: str = "Expected a JSON array or NDJSON of users") -> None:
+        super().__init__(message="Invalid user import payload", status_code=400, detail=detail)
+
+class UserImportTooLargeException(BaseServiceException):
+    def __init__(self, max_rows: int) -> None:
+        message = f"User import is limited to {max_rows} rows per request"
+        super().__init__(message=message, status_code=413)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from src.config.logger import get_logger
+from src.config.settings import get_async_sessionmaker
+from src.services.token_service import TokenService
+
+logger = get_logger("TokenFilterJob")
+
+
+async def rebuild_refresh_token_filter() -> int:
+    try:
+        async with get_async_sessionmaker()() as db:
+            return await TokenService(db).rebuild_filter()
+    except Exception:
+        logger.exception("failed to rebuild refresh token filter")
+        return 0
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+from src.config.logger import get_logger
+from src.config.settings import dispose_async_engine, get_async_sessionmaker, get_settings
+from src.jobs.token_filter import rebuild_refresh_token_filter
+from src.schemas.token.token_purge_report_schema import TokenPurgeReportSchema
+from src.services.token_service import TokenService
+
+logger = get_logger("TokenPurgeJob")
+
+
+async def purge_refresh_tokens(
+    retention_hours: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+) -> TokenPurgeReportSchema:
+    settings = get_settings()
+    async with get_async_sessionmaker()() as db:
+        return await TokenService(db).purge(
+            retention=timedelta(
+                hours=settings.refresh_token_purge_retention_hours
+                if retention_hours is None
+                else retention_hours
+            ),
+            batch_size=batch_size or settings.refresh_token_purge_batch_size,
+            pause_seconds=settings.refresh_token_purge_pause_seconds
+            if pause_seconds is None
+            else pause_seconds,
+        )
+
+
+async def run_token_purge_loop(interval_seconds: Optional[int] = None) -> None:
+    interval = interval_seconds or get_settings().refresh_token_purge_interval_seconds
+    while True:
+        try:
+            await purge_refresh_tokens()
+            # Drop digests of purged rows and reset any rotated generations.
+            await rebuild_refresh_token_filter()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("scheduled refresh token purge failed")
+        await asyncio.sleep(interval)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Delete expired and long-revoked refresh tokens in batches."
+    )
+    parser.add_argument("--retention-hours", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--pause-seconds", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    async def _run() -> TokenPurgeReportSchema:
+        try:
+            return await purge_refresh_tokens(
+                retention_hours=args.retention_hours,
+                batch_size=args.batch_size,
+                pause_seconds=args.pause_seconds,
+            )
+        finally:
+            await dispose_async_engine()
+
+    report = asyncio.run(_run())
+    print(report.model_dump_json())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from src.metrics.registry import CollectorResult, MetricsRegistry
+from src.utils.login_limiter import get_login_limiter
+from src.utils.password_hasher import get_password_hashing_pool
+from src.utils.principal_cache import get_principal_cache
+from src.utils.refresh_coalescer import get_refresh_coalescer
+from src.utils.token_filter import get_refresh_token_filter
+
+
+def _instantiated(factory) -> bool:
+    return factory.cache_info().currsize > 0
+
+
+def collect_component_stats() -> Iterable[CollectorResult]:
+    # Only report singletons this worker has actually created.
+    if _instantiated(get_password_hashing_pool):
+        pool = get_password_hashing_pool()
+        yield ("password_hash_in_flight", "gauge", "Password operations queued or running.", (), {(): pool.in_flight})
+        yield ("password_hash_rejected_total", "counter", "Password operations shed by admission control.", (), {(): pool.rejected})
+    if _instantiated(get_login_limiter):
+        stats = get_login_limiter().stats()
+        yield ("login_attempts_processed_total", "counter", "Login attempts admitted by the limiter.", (), {(): stats["processed"]})
+        yield (
+            "login_attempts_rejected_total",
+            "counter",
+            "Login attempts rejected by the limiter.",
+            ("scope",),
+            {("username",): stats["rejected_username"], ("ip",): stats["rejected_ip"]},
+        )
+    if _instantiated(get_principal_cache):
+        stats = get_principal_cache().stats()
+        yield (
+            "principal_cache_events_total",
+            "counter",
+            "Principal cache lookups and evictions.",
+            ("event",),
+            {("hit",): stats["hits"], ("miss",): stats["misses"], ("eviction",): stats["evictions"]},
+        )
+        yield ("principal_cache_size", "gauge", "Cached principals.", (), {(): stats["size"]})
+    if _instantiated(get_refresh_coalescer):
+        yield (
+            "refresh_coalesced_total",
+            "counter",
+            "Refresh requests served from an in-flight or recent rotation.",
+            (),
+            {(): get_refresh_coalescer().coalesced},
+        )
+    if _instantiated(get_refresh_token_filter):
+        stats = get_refresh_token_filter().stats()
+        yield (
+            "refresh_token_filter_hits_total",
+            "counter",
+            "Refresh lookups matched by the negative filter.",
+            ("kind",),
+            {
+                ("revoked",): stats["revoked_hits"],
+                ("false_positive",): stats["revoked_false_positives"],
+                ("missing",): stats["missing_hits"],
+            },
+        )
+        yield (
+            "refresh_token_filter_memory_bytes",
+            "gauge",
+            "Approximate memory held by the negative filter.",
+            ("part",),
+            {("bloom",): stats["revoked_memory_bytes"], ("missing",): stats["missing_memory_bytes"]},
+        )
+        yield (
+            "refresh_token_filter_false_positive_rate",
+            "gauge",
+            "Estimated Bloom filter false-positive rate at current fill.",
+            (),
+            {(): stats["revoked_false_positive_rate"]},
+        )
+
+
+def register_default_collectors(registry: MetricsRegistry) -> None:
+    registry.register_collector(collect_component_stats)
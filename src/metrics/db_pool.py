@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from src.metrics.instruments import DB_POOL_CHECKOUT_WAIT
+
+# SQLAlchemy names pool loggers after the pool class's module, which puts this
+# subclass outside the "sqlalchemy" logger tree that defaults to WARNING.
+logging.getLogger(__name__).setLevel(logging.WARNING)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    # SQLAlchemy has no "before checkout" event, so the wait is measured
+    # around the pool's own queue get (which includes overflow connects).
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+from src.config.logger import get_logger
+from src.config.settings import get_settings
+from src.metrics.collectors import register_default_collectors
+from src.metrics.instruments import registry
+from src.metrics.registry import (
+    Snapshot,
+    merge_snapshots,
+    read_snapshots,
+    remove_snapshot,
+    render_text,
+    write_snapshot,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = get_logger("MetricsExporter")
+
+register_default_collectors(registry)
+
+
+def _worker_snapshot() -> Snapshot:
+    snapshot = registry.snapshot()
+    # Gauges are point-in-time per worker, so summing them across workers
+    # would be wrong; keep them apart with a pid label instead.
+    pid = str(os.getpid())
+    for family in snapshot.values():
+        if family["type"] == "gauge":
+            family["labels"] = family["labels"] + ["pid"]
+            family["samples"] = [[labels + [pid], value] for labels, value in family["samples"]]
+    return snapshot
+
+
+def flush_metrics(directory: Optional[str] = None) -> None:
+    directory = directory or get_settings().metrics_multiproc_dir
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    write_snapshot(directory, _worker_snapshot())
+
+
+def discard_metrics(directory: Optional[str] = None) -> None:
+    directory = directory or get_settings().metrics_multiproc_dir
+    if directory:
+        remove_snapshot(directory)
+
+
+def render_metrics() -> str:
+    directory = get_settings().metrics_multiproc_dir
+    if not directory:
+        return render_text(registry.snapshot())
+    flush_metrics(directory)
+    return render_text(merge_snapshots(read_snapshots(directory)))
+
+
+async def run_metrics_flush_loop(interval_seconds: Optional[float] = None) -> None:
+    interval = interval_seconds or get_settings().metrics_flush_interval_seconds
+    while True:
+        try:
+            await asyncio.to_thread(flush_metrics)
+        except Exception:
+            logger.exception("failed to flush metrics snapshot")
+        await asyncio.sleep(interval)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from src.metrics.registry import MetricsRegistry
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+PASSWORD_VERIFY_DURATION = registry.histogram(
+    "password_verify_duration_seconds",
+    "Wall time of password verifications, including executor queueing.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+TOKEN_ROTATE_DURATION = registry.histogram(
+    "refresh_token_rotate_duration_seconds",
+    "Refresh token rotation latency by outcome.",
+    ("outcome",),
+)
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the async engine pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+DB_REQUEST_QUERIES = registry.histogram(
+    "db_request_queries",
+    "SQL statements executed per HTTP request.",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_REQUEST_QUERY_SECONDS = registry.histogram(
+    "db_request_query_seconds",
+    "Cumulative SQL execution time per HTTP request.",
+    ("method", "route"),
+)
+DB_SUSPECTED_N_PLUS_ONE = registry.counter(
+    "db_suspected_n_plus_one_total",
+    "Requests where one statement repeated past the N+1 threshold.",
+    ("method", "route"),
+)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import copy
+import json
+import math
+import os
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+Snapshot = Dict[str, Dict[str, Any]]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = [[list(labels), value] for labels, value in self._values.items()]
+        return {"type": self.type_name, "help": self.help, "labels": list(self.label_names), "samples": samples}
+
+
+class Histogram:
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[label_values] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = [
+                [list(labels), {"buckets": list(counts), "sum": total, "count": count}]
+                for labels, (counts, total, count) in self._values.items()
+            ]
+        return {
+            "type": self.type_name,
+            "help": self.help,
+            "labels": list(self.label_names),
+            "buckets": list(self.buckets),
+            "samples": samples,
+        }
+
+
+# A callback returns (name, type, help, label names, {label values: value}).
+CollectorResult = Tuple[str, str, str, Sequence[str], Dict[LabelValues, float]]
+Collector = Callable[[], Iterable[CollectorResult]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Snapshot:
+        snapshot = {name: metric.snapshot() for name, metric in self._metrics.items()}
+        for collector in self._collectors:
+            for name, type_name, help_text, label_names, values in collector():
+                snapshot[name] = {
+                    "type": type_name,
+                    "help": help_text,
+                    "labels": list(label_names),
+                    "samples": [[list(labels), value] for labels, value in values.items()],
+                }
+        return snapshot
+
+
+def merge_snapshots(snapshots: Iterable[Snapshot]) -> Snapshot:
+    merged: Snapshot = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(
+                name, {**family, "samples": [], "_index": {}}
+            )
+            index: Dict[Tuple[str, ...], Any] = target["_index"]
+            for labels, value in family["samples"]:
+                key = tuple(labels)
+                current = index.get(key)
+                if current is None:
+                    index[key] = copy.deepcopy(value)
+                elif isinstance(value, dict):
+                    current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                else:
+                    index[key] = current + value
+    for family in merged.values():
+        family["samples"] = [[list(labels), value] for labels, value in family.pop("_index").items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_text(snapshot: Snapshot) -> str:
+    lines: List[str] = []
+    for name in sorted(snapshot):
+        family = snapshot[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        label_names = family["labels"]
+        for labels, value in family["samples"]:
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(label_names, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(family["buckets"] + [math.inf], value["buckets"]):
+                cumulative += count
+                le = ("le", _number(bound))
+                lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(label_names, labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(label_names, labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"metrics-{pid}.json")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(directory: str, snapshot: Snapshot) -> None:
+    path = _snapshot_path(directory, os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(snapshot, handle)
+    os.replace(tmp, path)
+
+
+def remove_snapshot(directory: str) -> None:
+    try:
+        os.remove(_snapshot_path(directory, os.getpid()))
+    except FileNotFoundError:
+        pass
+
+
+def read_snapshots(directory: str) -> List[Snapshot]:
+    snapshots: List[Snapshot] = []
+    for entry in sorted(os.listdir(directory)):
+        if not (entry.startswith("metrics-") and entry.endswith(".json")):
+            continue
+        pid = entry[len("metrics-"):-len(".json")]
+        if not pid.isdigit():
+            continue
+        if not _pid_alive(int(pid)):
+            # A worker that died without cleaning up; its gauges are stale.
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass
+            continue
+        try:
+            with open(os.path.join(directory, entry), encoding="utf-8") as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            continue
+    return snapshots
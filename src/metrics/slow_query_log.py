@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config.logger import get_logger, request_id_var
+from src.metrics.sql_instrumentation import EXPLAINING, attach_query_timer, query_elapsed
+from src.schemas.diagnostics.slow_query_schema import SlowQuerySchema
+
+try:
+    from greenlet import getcurrent
+except ImportError:
+    getcurrent = None
+
+logger = get_logger("SlowQueryLog")
+
+MAX_STATEMENT_LENGTH = 4000
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE")
+_INTERNAL_MODULES = ("src.metrics", "src.config")
+
+
+def _redact(parameters: Any) -> Any:
+    def mask(value: Any) -> Any:
+        if value is None or isinstance(value, bool):
+            return value
+        return f"<{type(value).__name__}>"
+
+    if isinstance(parameters, dict):
+        return {key: mask(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(p) if isinstance(p, (dict, list, tuple)) else mask(p) for p in parameters]
+    return None
+
+
+def _app_frame(frame: Optional[FrameType]) -> Optional[str]:
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("src.") and not module.startswith(_INTERNAL_MODULES):
+            return f"{frame.f_code.co_qualname} ({module}:{frame.f_lineno})"
+        frame = frame.f_back
+    return None
+
+
+def _caller() -> Optional[str]:
+    caller = _app_frame(sys._getframe(2))
+    if caller is None and getcurrent is not None:
+        # Async sessions run the DBAPI call in a child greenlet whose stack
+        # ends at SQLAlchemy; the awaiting service frames hang off the parent.
+        parent = getcurrent().parent
+        if parent is not None:
+            caller = _app_frame(parent.gr_frame)
+    return caller
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = 0.0,
+        explain: bool = False,
+        max_entries: int = 200,
+        max_explained: int = 1000,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_explained = max(1, max_explained)
+        self._entries: deque[SlowQuerySchema] = deque(maxlen=max(1, max_entries))
+        self._explained: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _explain(self, conn, statement: str, parameters: Any) -> List[Dict[str, Any]]:
+        with self._lock:
+            cached = self._explained.get(statement)
+        if cached is not None:
+            return cached
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        conn.info[EXPLAINING] = True
+        try:
+            result = conn.exec_driver_sql(prefix + statement, parameters)
+            rows = [dict(row._mapping) for row in result]
+        finally:
+            conn.info[EXPLAINING] = False
+        with self._lock:
+            self._explained[statement] = rows
+            while len(self._explained) > self.max_explained:
+                self._explained.popitem(last=False)
+        return rows
+
+    def _explainable(self, statement: str, context, executemany: bool) -> bool:
+        if not self.explain or executemany:
+            return False
+        # A second statement on a connection with a pending server-side
+        # cursor would drain it (unbuffered results on MySQL drivers).
+        options = context.execution_options if context is not None else {}
+        if options.get("stream_results") or options.get("yield_per"):
+            return False
+        return statement.lstrip().upper().startswith(EXPLAINABLE)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if conn.info.get(EXPLAINING):
+            return
+        elapsed = query_elapsed(context)
+        if elapsed is None or elapsed * 1000 < self.threshold_ms:
+            return
+
+        explain_rows: Optional[List[Dict[str, Any]]] = None
+        explain_error: Optional[str] = None
+        if self._explainable(statement, context, executemany):
+            try:
+                explain_rows = self._explain(conn, statement, parameters)
+            except Exception as exc:
+                explain_error = str(exc)
+
+        entry = SlowQuerySchema(
+            recorded_at=datetime.now(timezone.utc),
+            duration_ms=round(elapsed * 1000, 3),
+            statement=" ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+            parameters=_redact(parameters),
+            caller=_caller(),
+            request_id=request_id_var.get(),
+            explain=explain_rows,
+            explain_error=explain_error,
+        )
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning(
+            "slow query %.1f ms in %s: %s",
+            entry.duration_ms, entry.caller, entry.statement[:200],
+            extra={"slow_query": entry.model_dump(mode="json")},
+        )
+
+    def configure(self, threshold_ms: float, explain: bool, max_entries: int) -> None:
+        with self._lock:
+            self.threshold_ms = threshold_ms
+            self.explain = explain
+            if self._entries.maxlen != max(1, max_entries):
+                self._entries = deque(self._entries, maxlen=max(1, max_entries))
+
+    def attach(self, engine: Engine) -> None:
+        if self.threshold_ms <= 0:
+            return
+        attach_query_timer(engine)
+        if not event.contains(engine, "after_cursor_execute", self._after_cursor_execute):
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def entries(self, limit: Optional[int] = None) -> List[SlowQuerySchema]:
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit] if limit else items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._explained.clear()
+
+
+@lru_cache
+def get_slow_query_log() -> SlowQueryLog:
+    return SlowQueryLog()
+
+
+def instrument_slow_queries(engine: Engine, threshold_ms: float, explain: bool, max_entries: int) -> None:
+    slow_log = get_slow_query_log()
+    slow_log.configure(threshold_ms, explain, max_entries)
+    slow_log.attach(engine)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config.logger import get_logger
+
+logger = get_logger("SqlInstrumentation")
+
+# Set in Connection.info while the slow-query log runs its own EXPLAIN.
+EXPLAINING = "explaining"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    statements: StatementCounter = field(default_factory=StatementCounter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.statements[statement] += 1
+
+    def suspected_n_plus_one(self, threshold: int) -> List[Tuple[str, int]]:
+        # Same SQL text, different parameters, executed over and over in one
+        # request is the usual shape of a lazy load inside a loop.
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def query_elapsed(context) -> Optional[float]:
+    started = getattr(context, "_query_started", None)
+    return time.perf_counter() - started if started is not None else None
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if conn.info.get(EXPLAINING):
+        return
+    stats = current_query_stats.get()
+    elapsed = query_elapsed(context)
+    if stats is not None and elapsed is not None:
+        stats.record(statement, elapsed)
+
+
+def attach_query_timer(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def instrument_engine(engine: Engine) -> None:
+    attach_query_timer(engine)
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+@contextmanager
+def count_queries(*engines: Engine) -> Iterator[QueryStats]:
+    # Engine-scoped rather than context-scoped, so statements run from other
+    # tasks (e.g. a test client's event loop) are counted too.
+    stats = QueryStats()
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = query_elapsed(context)
+        if not conn.info.get(EXPLAINING):
+            stats.record(statement, elapsed or 0.0)
+
+    for engine in engines:
+        attach_query_timer(engine)
+        event.listen(engine, "after_cursor_execute", record)
+    try:
+        yield stats
+    finally:
+        for engine in engines:
+            event.remove(engine, "after_cursor_execute", record)
+
+
+def report_n_plus_one(stats: QueryStats, threshold: int, where: str) -> int:
+    suspects = stats.suspected_n_plus_one(threshold)
+    for sql, repeats in suspects:
+        logger.warning(
+            "suspected N+1 in %s: statement ran %d times: %s",
+            where, repeats, " ".join(sql.split())[:200],
+        )
+    return len(suspects)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics.instruments import (
+    DB_REQUEST_QUERIES,
+    DB_REQUEST_QUERY_SECONDS,
+    DB_SUSPECTED_N_PLUS_ONE,
+)
+from src.metrics.sql_instrumentation import QueryStats, current_query_stats, report_n_plus_one
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 5, debug_headers: bool = False) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.debug_headers = debug_headers
+
+    def _add_headers(self, message: Message, stats: QueryStats) -> None:
+        headers = MutableHeaders(scope=message)
+        headers.append("x-db-query-count", str(stats.count))
+        headers.append("x-db-query-time-ms", f"{stats.seconds * 1000:.2f}")
+        suspects = stats.suspected_n_plus_one(self.n_plus_one_threshold)
+        if suspects:
+            headers.append("x-db-suspected-n-plus-one", str(len(suspects)))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        pending_start: Optional[Message] = None
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal pending_start
+            if not self.debug_headers:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk tells whether the body
+                # is streamed; a streamed body runs its queries after the
+                # headers are gone, so it gets no (misleading) figures.
+                pending_start = message
+                return
+            if pending_start is not None:
+                start, pending_start = pending_start, None
+                if not message.get("more_body", False):
+                    self._add_headers(start, stats)
+                await send(start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            DB_REQUEST_QUERIES.observe(stats.count, method, template)
+            DB_REQUEST_QUERY_SECONDS.observe(stats.seconds, method, template)
+            suspects = report_n_plus_one(stats, self.n_plus_one_threshold, f"{method} {template}")
+            if suspects:
+                DB_SUSPECTED_N_PLUS_ONE.inc(method, template, amount=suspects)
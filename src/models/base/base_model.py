@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-import uuid
 from abc import ABCMeta
 from datetime import date, datetime, timezone
 from typing import Any, Dict, Iterable, Optional, Sequence
 
-from sqlalchemy import Column, DateTime, String, func
+from sqlalchemy import Column, DateTime, func
 from sqlalchemy.inspection import inspect
 from sqlalchemy.orm import DeclarativeMeta
 
 from src.config.settings import Base
+from src.models.base.identifiers import id_column_type, new_id
 
 
 class ModelMeta(DeclarativeMeta, ABCMeta):
@@ -19,7 +19,7 @@ class ModelMeta(DeclarativeMeta, ABCMeta):
 class BaseModel(Base, metaclass=ModelMeta):
     __abstract__ = True
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(id_column_type(), primary_key=True, default=new_id)
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import String, inspect
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.types import BINARY, TypeDecorator
+
+from src.config.settings import get_settings
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp_ms = _uuid7_last_ms
+        counter = _uuid7_counter
+
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    if get_settings().id_strategy == "uuid7":
+        return str(uuid7())
+    return str(uuid.uuid4())
+
+
+class BinaryUUID(TypeDecorator):
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return value
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
+
+
+def id_column_type():
+    if get_settings().id_storage == "binary":
+        return BinaryUUID()
+    return String(36)
+
+
+ID_STORAGE_TABLES = ("roles", "users", "refresh_tokens")
+
+
+def _stored_as(column_type) -> Optional[str]:
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return None
+    # SQLite reflects BINARY(16) with numeric affinity; leave it unchecked.
+    return {bytes: "binary", str: "string"}.get(python_type)
+
+
+def verify_id_storage(engine: Engine) -> None:
+    # The models pick their id type from ID_STORAGE at import time, while the
+    # schema only changes through migration d7a3b9e2c5f1. Refuse to start if
+    # the two have drifted apart instead of failing on the first query.
+    expected = get_settings().id_storage
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    for table in ID_STORAGE_TABLES:
+        if table not in tables:
+            continue
+        column = next(c for c in inspector.get_columns(table) if c["name"] == "id")
+        actual = _stored_as(column["type"])
+        if actual is not None and actual != expected:
+            raise RuntimeError(
+                f"{table}.id is stored as {actual} but ID_STORAGE={expected}; "
+                "migrate the schema (alembic revision d7a3b9e2c5f1) with the "
+                "same ID_STORAGE value the application runs with"
+            )
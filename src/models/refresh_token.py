@@ -3,30 +3,38 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String
+from sqlalchemy import BINARY, Boolean, Column, DateTime, ForeignKey, Index, String
 
 from src.models.base.base_model import BaseModel
+from src.models.base.identifiers import id_column_type
 
 
 class RefreshToken(BaseModel):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_device_revoked", "user_id", "device_id", "revoked"),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+        Index("ix_refresh_tokens_revoked_rotated_at", "revoked", "rotated_at"),
+    )
 
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(id_column_type(), ForeignKey("users.id"), nullable=False)
     jti = Column(String(36), unique=True, nullable=False)
-    token_hash = Column(String(128), nullable=False, unique=True)
+    token_hash = Column(String(128), nullable=True, unique=True)
+    token_digest = Column(BINARY(32), nullable=True, unique=True)
     device_id = Column(String(255), nullable=True)
     ip = Column(String(45), nullable=True)
     user_agent = Column(String(512), nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     revoked = Column(Boolean, default=False, nullable=False)
-    rotated_from = Column(String(36), ForeignKey("refresh_tokens.id"), nullable=True)
+    rotated_from = Column(id_column_type(), ForeignKey("refresh_tokens.id"), nullable=True)
     rotated_at = Column(DateTime(timezone=True), nullable=True)
 
     def __init__(
         self,
         user_id: str,
         jti: str,
-        token_hash: str,
+        token_hash: Optional[str] = None,
+        token_digest: Optional[bytes] = None,
         device_id: Optional[str] = None,
         ip: Optional[str] = None,
         user_agent: Optional[str] = None,
@@ -42,6 +50,7 @@ class RefreshToken(BaseModel):
         self.user_id = user_id
         self.jti = jti
         self.token_hash = token_hash
+        self.token_digest = token_digest
         self.device_id = device_id
         self.ip = ip
         self.user_agent = user_agent
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from datetime import datetime
 from typing import Any, Dict, Optional
 from src.models.base.base_model import BaseModel
@@ -6,6 +6,7 @@ from src.models.base.base_model import BaseModel
 
 class Role(BaseModel):
     __tablename__ = "roles"
+    __table_args__ = (Index("ix_roles_created_at_id", "created_at", "id"),)
 
     name = Column(String(255), unique=True, nullable=False)
     description = Column(String(255), nullable=True)
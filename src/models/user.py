@@ -3,14 +3,16 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Column, Date, String, ForeignKey
+from sqlalchemy import Column, Date, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from src.models.base.base_model import BaseModel
+from src.models.base.identifiers import id_column_type
 
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     name = Column(String(255), nullable=False)
     username = Column(String(150), unique=True, nullable=False)
@@ -18,7 +20,7 @@ class User(BaseModel):
     password_hash = Column(String(255), nullable=False)
     cpf = Column(String(32), unique=True, nullable=False)
     birthday = Column(Date, nullable=False)
-    role_id = Column(String(36), ForeignKey("roles.id"), nullable=True)
+    role_id = Column(id_column_type(), ForeignKey("roles.id"), nullable=True)
     role = relationship("Role", backref="users")
 
     def __init__(
@@ -6,12 +6,16 @@ from fastapi import FastAPI
 from .user_routes import user_router
 from .role_routes import role_router
 from .auth_routes import auth_router
+from .metrics_routes import metrics_router
+from .admin_routes import admin_router
 
 
 routers = [
     user_router,
     role_router,
     auth_router,
+    metrics_router,
+    admin_router,
 ]
 
 def register_routes(app: FastAPI) -> None:
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, status
+
+from src.metrics.slow_query_log import get_slow_query_log
+from src.schemas.diagnostics.slow_query_schema import SlowQuerySchema
+from src.utils.permissions import admin_permission
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"], dependencies=[Depends(admin_permission)])
+
+
+@router.get("/slow-queries", response_model=List[SlowQuerySchema])
+async def list_slow_queries(limit: int = Query(50, ge=1, le=1000)) -> List[SlowQuerySchema]:
+    return get_slow_query_log().entries(limit)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries() -> None:
+    get_slow_query_log().clear()
+
+
+admin_router = router
@@ -16,7 +16,7 @@ async def login(
     response: Response = None,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    return auth_service.perform_login(form, request=request, response=response)
+    return await auth_service.perform_login(form, request=request, response=response)
 
 
 @router.post("/refresh", response_model=AccessTokenResponseSchema)
@@ -25,7 +25,7 @@ async def refresh(
     response: Response,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    return auth_service.perform_refresh(request=request, response=response)
+    return await auth_service.perform_refresh(request=request, response=response)
 
 
 auth_router = router
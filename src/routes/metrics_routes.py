@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.config.settings import get_settings
+from src.metrics.exporter import CONTENT_TYPE, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(default=None)):
+    settings = get_settings()
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.metrics_bearer_token and not _authorized(authorization, settings.metrics_bearer_token):
+        raise HTTPException(
+            status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+        )
+    # Multiprocess mode reads and writes snapshot files; keep that off the loop.
+    body = await asyncio.to_thread(render_metrics)
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
+
+def _authorized(header: Optional[str], token: str) -> bool:
+    scheme, _, credentials = (header or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+metrics_router = router
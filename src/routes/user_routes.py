@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from src.schemas.user.user_create_schema import UserCreateSchema
 from src.schemas.user.user_read_schema import UserReadSchema
+from src.schemas.user.user_page_schema import UserPageSchema
+from src.schemas.user.user_import_result_schema import UserImportResultSchema
 from src.schemas.user.user_response_schema import UserResponseSchema
 from src.schemas.user.user_update_schema import UserUpdateSchema
 from src.services.user_service import UserService, get_user_service
+from src.services.user_import_service import UserImportService, get_user_import_service
 from src.services.auth_service import get_current_user
-from src.models.user import User
+from src.schemas.auth.principal_schema import PrincipalSchema
 from src.utils.permissions import admin_permission
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"], dependencies=[Depends(admin_permission)])
@@ -20,19 +24,49 @@ router = APIRouter(prefix="/api/v1/users", tags=["users"], dependencies=[Depends
 async def create_user(
     user_in: UserCreateSchema,
     user_service: UserService = Depends(get_user_service),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_user),
 ):
-    return user_service.create_with_response(user_in=user_in, current_user=current_user)
+    return await user_service.create_with_response(user_in=user_in, current_user=current_user)
 
 
-@router.get("/", response_model=List[UserReadSchema])
-async def list_users(user_service: UserService = Depends(get_user_service)) -> List[UserReadSchema]:
-    return user_service.list_with_schema()
+@router.post("/import", response_model=UserImportResultSchema)
+async def import_users(
+    request: Request,
+    import_service: UserImportService = Depends(get_user_import_service),
+    current_user: PrincipalSchema = Depends(get_current_user),
+) -> UserImportResultSchema:
+    rows = import_service.parse_payload(await request.body(), request.headers.get("content-type"))
+    return await import_service.import_users(rows, current_user=current_user)
+
+
+@router.get("/", response_model=UserPageSchema)
+async def list_users(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    user_service: UserService = Depends(get_user_service),
+) -> UserPageSchema:
+    return await user_service.list_with_schema(cursor=cursor, limit=limit)
+
+
+@router.get("/export")
+async def export_users(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    user_service: UserService = Depends(get_user_service),
+) -> StreamingResponse:
+    if format == "csv":
+        body, media_type = user_service.export_csv(), "text/csv"
+    else:
+        body, media_type = user_service.export_ndjson(), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
 
 
 @router.get("/{user_id}", response_model=UserReadSchema)
 async def get_user(user_id: str, user_service: UserService = Depends(get_user_service)) -> UserReadSchema:
-    return user_service.get_with_schema(user_id)
+    return await user_service.get_with_schema(user_id)
 
 
 @router.patch("/{user_id}", response_model=UserReadSchema)
@@ -40,18 +74,18 @@ async def update_user(
     user_id: str,
     payload: UserUpdateSchema,
     user_service: UserService = Depends(get_user_service),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_user),
 ) -> UserReadSchema:
-    return user_service.update_with_validation(user_id, payload, current_user)
+    return await user_service.update_with_validation(user_id, payload, current_user)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: str,
     user_service: UserService = Depends(get_user_service),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_user),
 ) -> None:
-    user_service.delete_with_validation(user_id, current_user)
+    await user_service.delete_with_validation(user_id, current_user)
 
 
 user_router = router
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PrincipalSchema(BaseModel):
+    id: str
+    username: Optional[str] = None
+    role: Optional[str] = None
+    role_id: Optional[str] = None
+    jti: Optional[str] = None
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from src.schemas.base import BaseSchema
+
+
+class SlowQuerySchema(BaseSchema):
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Union[List[Any], Dict[str, Any], None] = None
+    caller: Optional[str] = None
+    request_id: Optional[str] = None
+    explain: Optional[List[Dict[str, Any]]] = None
+    explain_error: Optional[str] = None
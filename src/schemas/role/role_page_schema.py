@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from src.schemas.base import BaseSchema
+from src.schemas.role.role_read_schema import RoleReadSchema
+
+
+class RolePageSchema(BaseSchema):
+    items: List[RoleReadSchema]
+    next_cursor: Optional[str] = None
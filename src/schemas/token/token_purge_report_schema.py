@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class TokenPurgeReportSchema(BaseModel):
+    removed: int
+    batches: int
+    elapsed_seconds: float
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from src.schemas.base import BaseSchema
+
+
+class UserImportRowResultSchema(BaseSchema):
+    index: int
+    status: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class UserImportResultSchema(BaseSchema):
+    created: int
+    failed: int
+    skipped: int = 0
+    aborted: bool = False
+    error: Optional[str] = None
+    results: List[UserImportRowResultSchema]
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from src.schemas.base import BaseSchema
+from src.schemas.user.user_read_schema import UserReadSchema
+
+
+class UserPageSchema(BaseSchema):
+    items: List[UserReadSchema]
+    next_cursor: Optional[str] = None
@@ -3,18 +3,24 @@ import secrets
 from typing import Optional, Tuple
 from fastapi import Depends, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from src.models.user import User
-from src.utils.password import PasswordManager
-from src.utils.jwt_utils import JwtManager
-from src.config.settings import get_db
+from src.utils.password_hasher import get_password_hashing_pool
+from src.utils.jwt_utils import get_jwt_manager
+from src.utils.login_limiter import get_login_limiter
+from src.utils.principal_cache import get_principal_cache
+from src.utils.refresh_coalescer import get_refresh_coalescer
+from src.config.settings import get_async_db
 from src.config.jwt_config import JwtConfig
 from src.config.logger import get_logger
 from src.exceptions.auth.auth_exceptions import (
     InvalidCredentialsException,
     InvalidTokenException,
     InvalidTokenPayloadException,
+    LoginThrottledException,
+    PasswordHashingOverloadedException,
     UserNotFoundInTokenException,
 )
 from src.exceptions.token.token_exceptions import (
@@ -24,73 +30,116 @@ from src.exceptions.token.token_exceptions import (
     RefreshTokenInvalidException,
     )
 from src.schemas.auth.access_token_response_schema import AccessTokenResponseSchema
+from src.schemas.auth.principal_schema import PrincipalSchema
 from src.services.token_service import TokenService
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+MAX_IDENTIFIER_LENGTH = 254
+MAX_PASSWORD_LENGTH = 1024
+
 
 class AuthService:
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
     ) -> None:
         self.db = db
-        self.password_manager = PasswordManager()
-        self.jwt_manager = JwtManager()
+        self.password_hasher = get_password_hashing_pool()
+        self.jwt_manager = get_jwt_manager()
+        self.login_limiter = get_login_limiter()
         self.token_service = TokenService(db)
         self.jwt_config = JwtConfig()
         self.logger = get_logger(self.__class__.__name__)
 
-    def authenticate_user(
-        self, username_or_email: str, password: str
+    async def authenticate_user(
+        self, username_or_email: str, password: str, ip: Optional[str] = None
     ) -> User:
         try:
-            user = (
-                self.db.query(User)
-                .filter(
-                    or_(User.username == username_or_email, User.email == username_or_email)
-                )
-                .first()
-            )
+            if _is_malformed_login(username_or_email, password):
+                self.logger.info("authentication rejected: malformed credentials")
+                raise InvalidCredentialsException()
+            await self.login_limiter.check(username_or_email, ip)
+            user = await self._find_login_user(username_or_email)
             if not user:
                 self.logger.info("authentication failed: user not found for %s", username_or_email)
+                await self.password_hasher.verify_dummy(password)
+                await self.login_limiter.record_failure(username_or_email, ip)
                 raise InvalidCredentialsException()
-            if not self.password_manager.verify(password, user.password_hash):
+            if not await self.password_hasher.verify(password, user.password_hash):
                 self.logger.info("authentication failed: invalid password for %s", username_or_email)
+                await self.login_limiter.record_failure(username_or_email, ip)
                 raise InvalidCredentialsException()
+            await self.login_limiter.record_success(username_or_email, ip)
             self.logger.info("authenticated user id=%s username=%s", getattr(user, "id", None), user.username)
             return user
-        except InvalidCredentialsException:
+        except (
+            InvalidCredentialsException,
+            LoginThrottledException,
+            PasswordHashingOverloadedException,
+        ):
             raise
         except Exception:
             self.logger.exception("error during authenticate_user for %s", username_or_email)
             raise
 
+    async def _find_login_user(self, identifier: str) -> Optional[User]:
+        # One unique-index probe per column instead of an OR the planner may
+        # turn into an index merge. Emails always contain '@', so identifiers
+        # without one can only be usernames.
+        columns = (User.email, User.username) if "@" in identifier else (User.username,)
+        for column in columns:
+            result = await self.db.execute(
+                select(User)
+                .where(column == identifier)
+                .options(joinedload(User.role))
+                .limit(1)
+            )
+            user = result.scalars().first()
+            if user:
+                return user
+        return None
+
     def create_access_token_for_user(self, user: User) -> str:
         try:
-            token = self.jwt_manager.create_access_token(subject=str(user.id), username=user.username)
+            role = getattr(user, "role", None)
+            token = self.jwt_manager.create_access_token(
+                subject=str(user.id),
+                username=user.username,
+                role=getattr(role, "name", None),
+                role_id=getattr(user, "role_id", None),
+            )
             self.logger.info("created access token for user id=%s", getattr(user, "id", None))
             return token
         except Exception:
             self.logger.exception("failed to create access token for user id=%s", getattr(user, "id", None))
             raise
 
-    def perform_login(
+    async def perform_login(
         self,
         form: OAuth2PasswordRequestForm,
         request: Optional[Request] = None,
         response: Optional[Response] = None,
     ) -> AccessTokenResponseSchema:
         try:
-            user = self.authenticate_user(form.username, form.password)
+            ip = request.client.host if request and request.client else None
+            user = await self.authenticate_user(form.username, form.password, ip=ip)
             access_token = self.create_access_token_for_user(user)
             if request and response and self.token_service:
-                self._setup_refresh_token_and_cookies(user, request, response)
+                await self._setup_refresh_token_and_cookies(user, request, response)
             return AccessTokenResponseSchema(access_token=access_token)
+        except (
+            InvalidCredentialsException,
+            LoginThrottledException,
+            PasswordHashingOverloadedException,
+        ):
+            # Expected under credential stuffing or overload; authenticate_user
+            # already logged them at INFO, a traceback per attempt is noise.
+            raise
         except Exception:
             self.logger.exception("error during perform_login")
             raise
 
-    def perform_refresh(
+    async def perform_refresh(
         self,
         request: Request,
         response: Response,
@@ -103,8 +152,13 @@ class AuthService:
             
             self._validate_csrf_token(request)
             
-            new_raw, user_id = self._validate_and_rotate_token(request, raw_refresh, self.token_service)
-            user = self.db.get(User, user_id)
+            coalesce_key = f"{self.token_service.hash_raw(raw_refresh)}:{request.headers.get('x-device-id') or ''}"
+            new_raw, user_id = await get_refresh_coalescer().run(
+                coalesce_key,
+                lambda: self._validate_and_rotate_token(request, raw_refresh),
+                revalidate=self._successor_is_live,
+            )
+            user = await self.db.get(User, user_id, options=[joinedload(User.role)])
             if not user:
                 raise UserNotFoundInTokenException(user_id)
             
@@ -117,7 +171,7 @@ class AuthService:
             self.logger.exception("error during perform_refresh")
             raise
 
-    def _setup_refresh_token_and_cookies(
+    async def _setup_refresh_token_and_cookies(
         self,
         user: User,
         request: Request,
@@ -128,20 +182,20 @@ class AuthService:
         existing_raw = request.cookies.get(cookie_name)
         
         if existing_raw:
-            existing_rt = self.token_service.lookup_by_raw(existing_raw)
+            existing_rt = await self.token_service.lookup_by_raw(existing_raw)
             if existing_rt and existing_rt.is_active():
                 raw_refresh = existing_raw
             else:
-                raw_refresh = self._create_new_refresh_token(user, request)
+                raw_refresh = await self._create_new_refresh_token(user, request)
         else:
-            raw_refresh = self._create_new_refresh_token(user, request)
+            raw_refresh = await self._create_new_refresh_token(user, request)
         
         self._set_refresh_cookie(response, raw_refresh)
         
         self._setup_csrf_cookie(request, response)
 
-    def _create_new_refresh_token(self, user: User, request: Request) -> str:
-        return self.token_service.create_refresh_token(
+    async def _create_new_refresh_token(self, user: User, request: Request) -> str:
+        return await self.token_service.create_refresh_token(
             user_id=str(user.id),
             device_id=request.headers.get("x-device-id") if request else None,
             ip=request.client.host if request and request.client else None,
@@ -189,33 +243,39 @@ class AuthService:
         if not csrf_cookie or not csrf_header or csrf_cookie != csrf_header:
             raise InvalidCsrfTokenException()
 
-    def _validate_and_rotate_token(
+    async def _successor_is_live(self, result: Tuple[str, str]) -> bool:
+        successor = await self.token_service.lookup_by_raw(result[0])
+        return successor is not None and successor.is_active()
+
+    async def _validate_and_rotate_token(
         self, 
         request: Request, 
         raw_refresh: str, 
     ) -> Tuple[str, str]:
         device_header = request.headers.get("x-device-id")
-        lookup = self.token_service.lookup_by_raw(raw_refresh)
+        lookup = await self.token_service.lookup_by_raw(raw_refresh)
         
         if lookup is None:
             raise RefreshTokenInvalidException("Refresh token not found")
         
         if getattr(lookup, "device_id", None) and device_header and lookup.device_id != device_header:
             try:
-                self.token_service.revoke_all_for_user_and_device(
+                await self.token_service.revoke_all_for_user_and_device(
                     user_id=lookup.user_id, 
                     device_id=lookup.device_id
                 )
+                self.token_service.mark_revoked(raw_refresh)
             except Exception:
                 pass
             raise DeviceMismatchException()
 
         try:
-            new_raw, user_id = self.token_service.rotate(
+            new_raw, user_id = await self.token_service.rotate(
                 raw_refresh,
                 device_id=device_header if device_header else None,
                 ip=request.client.host if request and request.client else None,
                 user_agent=request.headers.get("user-agent") if request else None,
+                token=lookup,
             )
             return new_raw, user_id
         except ValueError as exc:
@@ -239,16 +299,24 @@ class AuthService:
             domain=self.jwt_config.refresh_cookie_domain or None,
         )
 
-def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
+
+def _is_malformed_login(identifier: str, password: str) -> bool:
+    candidate = identifier.strip() if identifier else ""
+    if not candidate or len(candidate) > MAX_IDENTIFIER_LENGTH:
+        return True
+    if any(ord(ch) < 32 or ord(ch) == 127 for ch in candidate):
+        return True
+    return not password or len(password) > MAX_PASSWORD_LENGTH
+
+
+def get_auth_service(db: AsyncSession = Depends(get_async_db)) -> AuthService:
     return AuthService(db)
 
 logger = get_logger("AuthService")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), auth_service: AuthService = Depends(get_auth_service)
-) -> User:
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> PrincipalSchema:
     try:
-        payload = auth_service.jwt_manager.decode_token(token)
+        payload = get_jwt_manager().decode_token(token)
     except ValueError as exc:
         logger.warning("invalid authentication credentials: %s", str(exc))
         raise InvalidTokenException(str(exc))
@@ -258,10 +326,36 @@ async def get_current_user(
         logger.warning("invalid token payload: missing 'sub'")
         raise InvalidTokenPayloadException("Missing 'sub' claim in token")
 
-    user = auth_service.db.get(User, sub)
-    if not user:
-        logger.warning("user not found for sub=%s", sub)
-        raise UserNotFoundInTokenException(sub)
+    return PrincipalSchema(
+        id=str(sub),
+        username=payload.get("username"),
+        role=payload.get("role"),
+        role_id=payload.get("role_id"),
+        jti=payload.get("jti"),
+    )
+
+async def get_current_user(
+    principal: PrincipalSchema = Depends(get_current_principal),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> PrincipalSchema:
+    # Token claims checked against the live user and role, so a demotion or
+    # deletion applies before the access token expires.
+    sub = principal.id
+    cache = get_principal_cache()
+    current = cache.get(sub)
+    if current is None:
+        user = await auth_service.db.get(User, sub, options=[joinedload(User.role)])
+        if not user:
+            logger.warning("user not found for sub=%s", sub)
+            raise UserNotFoundInTokenException(sub)
+        current = PrincipalSchema(
+            id=str(user.id),
+            username=user.username,
+            role=user.role.name if user.role else None,
+            role_id=str(user.role_id) if user.role_id else None,
+        )
+        cache.put(sub, current)
+        logger.info("retrieved current user id=%s", current.id)
 
-    logger.info("retrieved current user id=%s", getattr(user, "id", None))
-    return user
+    current.jti = principal.jti
+    return current
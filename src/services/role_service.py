@@ -1,73 +1,89 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.role import Role
 from src.schemas.role.role_create_schema import RoleCreateSchema
 from src.schemas.role.role_update_schema import RoleUpdateSchema
 from fastapi import Depends
-from src.config.settings import get_db
+from src.config.settings import get_async_db
 from src.config.logger import get_logger
 from typing import Optional as _Optional
-from src.models.user import User as _User
-from src.utils.permissions import admin_permission
+from src.utils.permissions import Principal, admin_permission
+from src.utils.principal_cache import get_principal_cache
 from src.exceptions.roles.role_exceptions import (
     RoleNotFoundException,
     RoleAlreadyExistsException,
 )
 from src.schemas.role.role_response_schema import RoleResponseSchema
 from src.schemas.role.role_read_schema import RoleReadSchema
+from src.schemas.role.role_page_schema import RolePageSchema
+from src.exceptions.pagination.pagination_exceptions import InvalidCursorException
+from src.utils.cursor import decode_cursor, encode_cursor
 
 class RoleService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
         self.logger = get_logger(self.__class__.__name__)
 
-    def _get_by_filter(self, **kwargs) -> Optional[Role]:
+    async def _get_by_filter(self, **kwargs) -> Optional[Role]:
         try:
             self.logger.info("fetching role by filter: %s", kwargs)
-            return self.db.query(Role).filter_by(**kwargs).first()
+            result = await self.db.execute(select(Role).filter_by(**kwargs).limit(1))
+            return result.scalars().first()
         except Exception:
             self.logger.exception("error fetching role by filter: %s", kwargs)
             raise
 
-    def get(self, role_id: str) -> Optional[Role]:
+    async def get(self, role_id: str) -> Optional[Role]:
         try:
             self.logger.info("fetching role by id=%s", role_id)
-            return self.db.get(Role, role_id)
+            return await self.db.get(Role, role_id)
         except Exception:
             self.logger.exception("error getting role id=%s", role_id)
             raise
 
-    def get_by_name(self, name: str) -> Optional[Role]:
+    async def get_by_name(self, name: str) -> Optional[Role]:
         try:
             self.logger.info("fetching role by name=%s", name)
-            return self._get_by_filter(name=name)
+            return await self._get_by_filter(name=name)
         except Exception:
             self.logger.exception("error getting role by name=%s", name)
             raise
 
-    def list(self, skip: int = 0, limit: int = 100) -> List[Role]:
+    async def list(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Role], Optional[str]]:
         try:
-            self.logger.info("listing roles skip=%d limit=%d", skip, limit)
-            return self.db.query(Role).offset(skip).limit(limit).all()
+            self.logger.info("listing roles cursor=%s limit=%d", cursor, limit)
+            query = select(Role).order_by(Role.created_at, Role.id).limit(limit + 1)
+            after = decode_cursor(cursor)
+            if after is not None:
+                query = query.where(tuple_(Role.created_at, Role.id) > after)
+            roles = list((await self.db.execute(query)).scalars().all())
+            next_cursor = None
+            if len(roles) > limit:
+                roles = roles[:limit]
+                next_cursor = encode_cursor(roles[-1].created_at, roles[-1].id)
+            return roles, next_cursor
+        except InvalidCursorException:
+            raise
         except Exception:
-            self.logger.exception("error listing roles skip=%d limit=%d", skip, limit)
+            self.logger.exception("error listing roles cursor=%s limit=%d", cursor, limit)
             raise
 
-    def create(self, *, role_in: RoleCreateSchema, current_user: _Optional[_User] = None) -> Role:
+    async def create(self, *, role_in: RoleCreateSchema, current_user: _Optional[Principal] = None) -> Role:
         try:
             admin_permission.ensure(current_user)
-            if self.get_by_name(role_in.name):
+            if await self.get_by_name(role_in.name):
                 self.logger.warning("attempt to create role with existing name=%s", role_in.name)
                 raise RoleAlreadyExistsException(role_in.name)
 
             role = Role(name=role_in.name, description=role_in.description)
             self.db.add(role)
-            self.db.commit()
-            self.db.refresh(role)
+            await self.db.commit()
+            await self.db.refresh(role)
             self.logger.info("created role id=%s name=%s", getattr(role, "id", None), role.name)
             return role
         except RoleAlreadyExistsException:
@@ -76,42 +92,45 @@ class RoleService:
             self.logger.exception("failed to create role name=%s", getattr(role_in, "name", None))
             raise
 
-    def get_with_validation(self, role_id: str) -> Role:
-        role = self.get(role_id)
+    async def get_with_validation(self, role_id: str) -> Role:
+        role = await self.get(role_id)
         if not role:
             raise RoleNotFoundException(role_id)
         return role
 
-    def create_with_response(self, *, role_in: RoleCreateSchema, current_user: _Optional[_User] = None) -> RoleResponseSchema:
-        role = self.create(role_in=role_in, current_user=current_user)
+    async def create_with_response(self, *, role_in: RoleCreateSchema, current_user: _Optional[Principal] = None) -> RoleResponseSchema:
+        role = await self.create(role_in=role_in, current_user=current_user)
         return RoleResponseSchema(
             message="role created", 
             role=RoleReadSchema.from_orm(role)
         )
 
-    def list_with_schema(self, skip: int = 0, limit: int = 100) -> list[RoleReadSchema]:
-        roles = self.list(skip, limit)
-        return [RoleReadSchema.from_orm(r) for r in roles]
+    async def list_with_schema(self, cursor: Optional[str] = None, limit: int = 100) -> RolePageSchema:
+        roles, next_cursor = await self.list(cursor, limit)
+        return RolePageSchema(
+            items=[RoleReadSchema.from_orm(r) for r in roles],
+            next_cursor=next_cursor,
+        )
 
-    def get_with_schema(self, role_id: str) -> RoleReadSchema:
-        role = self.get_with_validation(role_id)
+    async def get_with_schema(self, role_id: str) -> RoleReadSchema:
+        role = await self.get_with_validation(role_id)
         return RoleReadSchema.from_orm(role)
 
-    def update_with_validation(
+    async def update_with_validation(
         self,
         role_id: str,
         role_in: RoleUpdateSchema,
-        current_user: _Optional[_User] = None
+        current_user: _Optional[Principal] = None
     ) -> RoleReadSchema:
-        role = self.get_with_validation(role_id)
-        updated_role = self.update(role, role_in=role_in, current_user=current_user)
+        role = await self.get_with_validation(role_id)
+        updated_role = await self.update(role, role_in=role_in, current_user=current_user)
         return RoleReadSchema.from_orm(updated_role)
 
-    def delete_with_validation(self, role_id: str, current_user: _Optional[_User] = None) -> None:
-        role = self.get_with_validation(role_id)
-        self.delete(role, current_user=current_user)
+    async def delete_with_validation(self, role_id: str, current_user: _Optional[Principal] = None) -> None:
+        role = await self.get_with_validation(role_id)
+        await self.delete(role, current_user=current_user)
 
-    def update(self, role: Role, *, role_in: RoleUpdateSchema, current_user: _Optional[_User] = None) -> Role:
+    async def update(self, role: Role, *, role_in: RoleUpdateSchema, current_user: _Optional[Principal] = None) -> Role:
         try:
             admin_permission.ensure(current_user)
             changed = False
@@ -125,8 +144,9 @@ class RoleService:
             if changed:
                 role.touch()
                 self.db.add(role)
-                self.db.commit()
-                self.db.refresh(role)
+                await self.db.commit()
+                get_principal_cache().invalidate_role(role.id)
+                await self.db.refresh(role)
 
             self.logger.info("updated role id=%s", getattr(role, "id", None))
             return role
@@ -134,15 +154,16 @@ class RoleService:
             self.logger.exception("error updating role id=%s", getattr(role, "id", None))
             raise
 
-    def delete(self, role: Role, current_user: _Optional[_User] = None) -> None:
+    async def delete(self, role: Role, current_user: _Optional[Principal] = None) -> None:
         try:
             admin_permission.ensure(current_user)
-            self.db.delete(role)
-            self.db.commit()
+            await self.db.delete(role)
+            await self.db.commit()
+            get_principal_cache().invalidate_role(role.id)
             self.logger.info("deleted role id=%s", getattr(role, "id", None))
         except Exception:
             self.logger.exception("error deleting role id=%s", getattr(role, "id", None))
             raise
 
-def get_role_service(db: Session = Depends(get_db)) -> RoleService:
+def get_role_service(db: AsyncSession = Depends(get_async_db)) -> RoleService:
     return RoleService(db)
@@ -2,137 +2,225 @@ from __future__ import annotations
 
 import hashlib
 import secrets
+import time
 import uuid
-from datetime import datetime, timezone
-from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
-from src.config.settings import get_db
+from src.config.settings import get_async_db, get_settings
 from src.config.jwt_config import JwtConfig
 from src.models.refresh_token import RefreshToken
 from src.config.logger import get_logger
+from src.metrics.instruments import TOKEN_ROTATE_DURATION
+from src.schemas.token.token_purge_report_schema import TokenPurgeReportSchema
+from src.stores.token.kv_client import get_kv_client
+from src.stores.token.kv_token_store import KeyValueTokenStore
+from src.stores.token.sql_token_store import SqlTokenStore
+from src.stores.token.token_store import TokenStore
+from src.utils.token_filter import get_refresh_token_filter
 
 class TokenService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession, store: Optional[TokenStore] = None) -> None:
         self.db = db
         self.config = JwtConfig()
+        self.store = store or _build_token_store(db)
+        self.token_filter = get_refresh_token_filter()
         self.logger = get_logger(self.__class__.__name__)
 
-    def _hash(self, raw: str) -> str:
+    def hash_raw(self, raw: str) -> str:
         return hashlib.sha256(raw.encode()).hexdigest()
 
-    def create_refresh_token(self, user_id: str, device_id: Optional[str] = None, ip: Optional[str] = None, user_agent: Optional[str] = None) -> str:
+    def digest_raw(self, raw: str) -> bytes:
+        return hashlib.sha256(raw.encode()).digest()
+
+    def mark_revoked(self, raw: str) -> None:
+        self.token_filter.add_revoked(self.digest_raw(raw))
+
+    async def _revoke_family(self, user_id: str, device_id: Optional[str], raw: str) -> None:
+        await self.revoke_all_for_user_and_device(user_id=user_id, device_id=device_id)
+        self.mark_revoked(raw)
+
+    async def create_refresh_token(self, user_id: str, device_id: Optional[str] = None, ip: Optional[str] = None, user_agent: Optional[str] = None) -> str:
         try:
             raw = secrets.token_urlsafe(64)
-            token_hash = self._hash(raw)
             jti = str(uuid.uuid4())
             expires_at = datetime.now(timezone.utc) + self.config.refresh_token_expires()
 
             refresh_token = RefreshToken(
                 user_id=user_id,
                 jti=jti,
-                token_hash=token_hash,
                 device_id=device_id,
                 ip=ip,
                 user_agent=user_agent,
                 expires_at=expires_at,
             )
-            self.db.add(refresh_token)
-            self.db.commit()
-            self.db.refresh(refresh_token)
+            await self.store.add(refresh_token, self.digest_raw(raw))
             return raw
         except Exception:
             self.logger.exception("failed to create refresh token for user_id=%s", user_id)
             raise
 
-    def revoke_by_raw(self, raw: str) -> None:
+    async def revoke_by_raw(self, raw: str) -> None:
         try:
-            hash = self._hash(raw)
-            token = self.db.query(RefreshToken).filter(RefreshToken.token_hash == hash).first()
+            digest = self.digest_raw(raw)
+            token = await self.store.get(digest)
             if not token:
                 return
-            token.revoked = True
-            token.rotated_at = datetime.now(timezone.utc)
-            self.db.add(token)
-            self.db.commit()
+            await self.store.revoke(token, digest, datetime.now(timezone.utc))
+            self.mark_revoked(raw)
         except Exception:
             self.logger.exception("failed to revoke refresh token by raw")
             raise
 
-    def rotate(self, raw: str, device_id: Optional[str] = None, ip: Optional[str] = None, user_agent: Optional[str] = None) -> Tuple[str, str]:
+    async def rotate(
+        self,
+        raw: str,
+        device_id: Optional[str] = None,
+        ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        token: Optional[RefreshToken] = None,
+    ) -> Tuple[str, str]:
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            hash = self._hash(raw)
-            token = self.db.query(RefreshToken).filter(RefreshToken.token_hash == hash).first()
+            digest = self.digest_raw(raw)
+            if token is None:
+                token = await self.store.get(digest)
             if not token:
                 raise ValueError("refresh token not found")
+            # A failed claim rolls the session back and expires ``token``;
+            # keep plain copies so the reuse path never lazy-loads it.
+            token_id, user_id, token_device_id = token.id, token.user_id, token.device_id
             now = datetime.now(timezone.utc)
             expires = token.expires_at
             if expires is not None and expires.tzinfo is None:
                 expires = expires.replace(tzinfo=timezone.utc)
             if token.revoked or (expires is not None and expires <= now):
-                try:
-                    self.revoke_all_for_user_and_device(user_id=token.user_id, device_id=token.device_id)
-                except Exception:
-                    pass
+                await self._revoke_family(user_id, token_device_id, raw)
                 raise ValueError("refresh token invalid")
 
-            token.revoked = True
-            token.rotated_at = datetime.now(timezone.utc)
-            self.db.add(token)
-            self.db.commit()
-
             new_raw = secrets.token_urlsafe(64)
-            new_hash = self._hash(new_raw)
             new_jti = str(uuid.uuid4())
             expires_at = datetime.now(timezone.utc) + self.config.refresh_token_expires()
 
             new_token = RefreshToken(
-                user_id=token.user_id,
+                user_id=user_id,
                 jti=new_jti,
-                token_hash=new_hash,
-                device_id=device_id or token.device_id,
+                device_id=device_id or token_device_id,
                 ip=ip or token.ip,
                 user_agent=user_agent or token.user_agent,
                 expires_at=expires_at,
-                rotated_from=token.id,
+                rotated_from=token_id,
+            )
+            claimed = await self.store.claim_and_replace(
+                token, digest, new_token, self.digest_raw(new_raw), now
             )
-            self.db.add(new_token)
-            self.db.commit()
-            self.db.refresh(new_token)
-            return new_raw, token.user_id
+            if not claimed:
+                self.logger.warning("refresh token id=%s was already rotated", token_id)
+                await self._revoke_family(user_id, token_device_id, raw)
+                raise ValueError("refresh token invalid")
+            outcome = "rotated"
+            return new_raw, user_id
         except ValueError:
+            outcome = "invalid"
             raise
         except Exception:
             self.logger.exception("failed to rotate refresh token")
             raise
+        finally:
+            TOKEN_ROTATE_DURATION.observe(time.perf_counter() - started, outcome)
 
-    def revoke_all_for_user_and_device(self, user_id: str, device_id: Optional[str] = None) -> None:
+    async def revoke_all_for_user_and_device(self, user_id: str, device_id: Optional[str] = None) -> None:
         try:
-            query = self.db.query(RefreshToken).filter(RefreshToken.user_id == user_id)
-            if device_id:
-                query = query.filter(RefreshToken.device_id == device_id)
-            tokens = query.all()
-            if not tokens:
-                return
-            now = datetime.now(timezone.utc)
-            for token_reads in tokens:
-                token_reads.revoked = True
-                token_reads.rotated_at = now
-                self.db.add(token_reads)
-            self.db.commit()
+            revoked = await self.store.revoke_family(user_id, device_id, datetime.now(timezone.utc))
+            self.logger.info(
+                "revoked %d refresh tokens for user_id=%s device_id=%s",
+                revoked, user_id, device_id,
+            )
         except Exception:
             self.logger.exception("failed to revoke all tokens for user_id=%s device_id=%s", user_id, device_id)
             raise
 
-    def lookup_by_raw(self, raw: str) -> Optional[RefreshToken]:
+    async def lookup_by_raw(self, raw: str) -> Optional[RefreshToken]:
         try:
-            hash = self._hash(raw)
-            token = self.db.query(RefreshToken).filter(RefreshToken.token_hash == hash).first()
+            digest = self.digest_raw(raw)
+            if self.token_filter.is_known_missing(digest):
+                return None
+            token = await self.store.get(digest)
+            if token is None:
+                self.token_filter.add_missing(digest)
+                return None
+            if self.token_filter.may_be_revoked(digest):
+                # The Bloom filter only routes; the row makes the decision, so
+                # a false positive cannot log a valid session out.
+                self.token_filter.record_revoked_hit(confirmed=token.revoked)
+                if token.revoked:
+                    return None
             return token
         except Exception:
             self.logger.exception("failed to lookup refresh token by raw")
             raise
 
+    async def load_revoked_digests(self, limit: int) -> List[bytes]:
+        try:
+            return await self.store.revoked_digests(limit)
+        except Exception:
+            self.logger.exception("failed to load revoked refresh token digests")
+            raise
+
+    async def rebuild_filter(self) -> int:
+        if not self.token_filter.enabled:
+            return 0
+        if isinstance(self.store, KeyValueTokenStore):
+            self.logger.info(
+                "refresh token filter starts empty with token_store=kv; "
+                "it warms up from runtime revocations"
+            )
+        digests = await self.load_revoked_digests(self.token_filter.capacity)
+        loaded = self.token_filter.rebuild(digests)
+        self.logger.info(
+            "rebuilt refresh token filter with %d revoked hashes (%d bytes)",
+            loaded, self.token_filter.stats()["revoked_memory_bytes"],
+        )
+        return loaded
+
+    async def purge(
+        self,
+        retention: timedelta,
+        batch_size: int = 500,
+        pause_seconds: float = 0.1,
+        max_batches: Optional[int] = None,
+    ) -> TokenPurgeReportSchema:
+        if isinstance(self.store, KeyValueTokenStore):
+            self.logger.warning(
+                "refresh token purge does nothing with token_store=kv; records expire by TTL"
+            )
+        started = time.monotonic()
+        try:
+            removed, batches = await self.store.purge(
+                retention, batch_size, pause_seconds, max_batches
+            )
+            report = TokenPurgeReportSchema(
+                removed=removed,
+                batches=batches,
+                elapsed_seconds=round(time.monotonic() - started, 3),
+            )
+            self.logger.info(
+                "purged %d refresh tokens in %d batches (%.3fs)",
+                report.removed, report.batches, report.elapsed_seconds,
+            )
+            return report
+        except Exception:
+            self.logger.exception("failed to purge refresh tokens")
+            raise
+
+
+def _build_token_store(db: AsyncSession) -> TokenStore:
+    if get_settings().token_store == "kv":
+        return KeyValueTokenStore(get_kv_client())
+    return SqlTokenStore(db)
+
 
-def get_token_service(db: Session = Depends(get_db)) -> TokenService:
+def get_token_service(db: AsyncSession = Depends(get_async_db)) -> TokenService:
     return TokenService(db)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import Depends
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.logger import get_logger
+from src.config.settings import get_async_db, get_settings
+from src.exceptions.base_exception import BaseServiceException
+from src.exceptions.users.user_exceptions import (
+    InvalidCpfException,
+    InvalidUserImportPayloadException,
+    RoleNotFoundForUserException,
+    UserAlreadyExistsException,
+    UserImportTooLargeException,
+)
+from src.models.role import Role
+from src.models.user import User
+from src.schemas.user.user_create_schema import UserCreateSchema
+from src.schemas.user.user_import_result_schema import (
+    UserImportResultSchema,
+    UserImportRowResultSchema,
+)
+from src.utils.cpf_validator import CPFValidator
+from src.utils.password_hasher import get_password_hashing_pool
+from src.utils.permissions import Principal, admin_permission
+
+UNIQUE_FIELDS = ("username", "email", "cpf")
+IN_CLAUSE_CHUNK = 1000
+
+
+class UserImportService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.password_hasher = get_password_hashing_pool()
+        self.cpf_validator = CPFValidator()
+        self.settings = get_settings()
+        self.logger = get_logger(self.__class__.__name__)
+
+    def parse_payload(self, body: bytes, content_type: Optional[str] = None) -> List[Any]:
+        try:
+            text = body.decode("utf-8")
+            if content_type and "ndjson" in content_type:
+                rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+            else:
+                rows = json.loads(text)
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise InvalidUserImportPayloadException(str(exc)) from exc
+        if not isinstance(rows, list):
+            raise InvalidUserImportPayloadException()
+        if len(rows) > self.settings.user_import_max_rows:
+            raise UserImportTooLargeException(self.settings.user_import_max_rows)
+        return rows
+
+    async def _existing_values(self, column, values: Set[str], fold_case: bool = False) -> Set[str]:
+        # With fold_case the returned values are lowercased to compare like
+        # UserService._find_conflict. MySQL's *_ci collation already matches
+        # case-insensitively (and keeps the index); SQLite needs NOCASE.
+        found: Set[str] = set()
+        ordered = list(values)
+        target = column
+        if fold_case and self.db.get_bind().dialect.name == "sqlite":
+            target = column.collate("NOCASE")
+        for start in range(0, len(ordered), IN_CLAUSE_CHUNK):
+            chunk = ordered[start:start + IN_CLAUSE_CHUNK]
+            result = await self.db.execute(select(column).where(target.in_(chunk)))
+            found.update(result.scalars().all())
+        return {value.lower() for value in found} if fold_case else found
+
+    def _validate_rows(
+        self, rows: List[Any], results: Dict[int, UserImportRowResultSchema]
+    ) -> List[Tuple[int, UserCreateSchema, str]]:
+        candidates: List[Tuple[int, UserCreateSchema, str]] = []
+        seen: Dict[str, Set[str]] = {field: set() for field in UNIQUE_FIELDS}
+        for index, row in enumerate(rows):
+            try:
+                user_in = UserCreateSchema.model_validate(row)
+            except ValidationError as exc:
+                error = exc.errors()[0]
+                location = ".".join(str(part) for part in error.get("loc", ()))
+                results[index] = _failed(index, f"{location}: {error['msg']}" if location else error["msg"])
+                continue
+
+            cpf_clean = self.cpf_validator.clean(user_in.cpf)
+            if not self.cpf_validator.is_valid(cpf_clean):
+                results[index] = _failed(index, InvalidCpfException(cpf_clean).message)
+                continue
+
+            values = {"username": user_in.username, "email": user_in.email, "cpf": cpf_clean}
+            duplicate = next((f for f in UNIQUE_FIELDS if values[f].lower() in seen[f]), None)
+            if duplicate:
+                results[index] = _failed(
+                    index, UserAlreadyExistsException(duplicate, values[duplicate]).message
+                )
+                continue
+            for field in UNIQUE_FIELDS:
+                seen[field].add(values[field].lower())
+            candidates.append((index, user_in, cpf_clean))
+        return candidates
+
+    async def _filter_conflicts(
+        self,
+        candidates: List[Tuple[int, UserCreateSchema, str]],
+        results: Dict[int, UserImportRowResultSchema],
+    ) -> List[Tuple[int, UserCreateSchema, str]]:
+        existing = {
+            "username": await self._existing_values(
+                User.username, {c[1].username for c in candidates}, fold_case=True
+            ),
+            "email": await self._existing_values(
+                User.email, {c[1].email for c in candidates}, fold_case=True
+            ),
+            "cpf": await self._existing_values(User.cpf, {c[2] for c in candidates}),
+        }
+        role_ids = {c[1].role_id for c in candidates if c[1].role_id}
+        known_roles = await self._existing_values(Role.id, role_ids) if role_ids else set()
+
+        remaining: List[Tuple[int, UserCreateSchema, str]] = []
+        for index, user_in, cpf_clean in candidates:
+            values = {"username": user_in.username, "email": user_in.email, "cpf": cpf_clean}
+            conflict = next((f for f in UNIQUE_FIELDS if values[f].lower() in existing[f]), None)
+            if conflict:
+                results[index] = _failed(
+                    index, UserAlreadyExistsException(conflict, values[conflict]).message
+                )
+            elif user_in.role_id and user_in.role_id not in known_roles:
+                results[index] = _failed(index, RoleNotFoundForUserException(user_in.role_id).message)
+            else:
+                remaining.append((index, user_in, cpf_clean))
+        return remaining
+
+    async def _insert_chunk(
+        self,
+        chunk: List[Tuple[int, User]],
+        results: Dict[int, UserImportRowResultSchema],
+    ) -> None:
+        try:
+            self.db.add_all([user for _, user in chunk])
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            if len(chunk) == 1:
+                index, user = chunk[0]
+                results[index] = _failed(index, f"User '{user.username}' conflicts with an existing user")
+                return
+            self.logger.warning("bulk insert of %d users conflicted, retrying row by row", len(chunk))
+            for index, user in chunk:
+                await self._insert_chunk([(index, _copy_user(user))], results)
+            return
+        for index, user in chunk:
+            results[index] = UserImportRowResultSchema(index=index, status="created", id=user.id)
+        self.db.expunge_all()
+
+    async def import_users(
+        self, rows: List[Any], current_user: Optional[Principal] = None
+    ) -> UserImportResultSchema:
+        try:
+            admin_permission.ensure(current_user)
+            self.logger.info("importing %d users", len(rows))
+            results: Dict[int, UserImportRowResultSchema] = {}
+
+            candidates = self._validate_rows(rows, results)
+            if candidates:
+                candidates = await self._filter_conflicts(candidates, results)
+
+            error: Optional[str] = None
+            batch_size = max(1, self.settings.user_import_batch_size)
+            for start in range(0, len(candidates), batch_size):
+                batch = candidates[start:start + batch_size]
+                try:
+                    hashes = await self.password_hasher.hash_many([c[1].password for c in batch])
+                    chunk = [
+                        (index, _build_user(user_in, cpf_clean, password_hash))
+                        for (index, user_in, cpf_clean), password_hash in zip(batch, hashes)
+                    ]
+                    await self._insert_chunk(chunk, results)
+                except Exception as exc:
+                    # Earlier batches are already committed; report them
+                    # rather than turning the whole import into a 5xx.
+                    await self.db.rollback()
+                    self.logger.exception("user import aborted at row %d", batch[0][0])
+                    error = exc.message if isinstance(exc, BaseServiceException) else "Import aborted"
+                    for index, _, _ in candidates[start:]:
+                        results.setdefault(index, _skipped(index, error))
+                    break
+
+            ordered = [results[index] for index in sorted(results)]
+            counts = {status: sum(1 for r in ordered if r.status == status) for status in ("created", "failed", "skipped")}
+            self.logger.info(
+                "imported users created=%d failed=%d skipped=%d",
+                counts["created"], counts["failed"], counts["skipped"],
+            )
+            return UserImportResultSchema(
+                created=counts["created"],
+                failed=counts["failed"],
+                skipped=counts["skipped"],
+                aborted=error is not None,
+                error=error,
+                results=ordered,
+            )
+        except Exception:
+            self.logger.exception("error importing %d users", len(rows))
+            raise
+
+
+def _failed(index: int, error: str) -> UserImportRowResultSchema:
+    return UserImportRowResultSchema(index=index, status="failed", error=error)
+
+
+def _skipped(index: int, error: str) -> UserImportRowResultSchema:
+    return UserImportRowResultSchema(index=index, status="skipped", error=error)
+
+
+def _build_user(user_in: UserCreateSchema, cpf_clean: str, password_hash: str) -> User:
+    return User(
+        name=user_in.name,
+        username=user_in.username,
+        email=user_in.email,
+        password_hash=password_hash,
+        cpf=cpf_clean,
+        birthday=user_in.birthday,
+        role_id=user_in.role_id,
+    )
+
+
+def _copy_user(user: User) -> User:
+    return User(
+        name=user.name,
+        username=user.username,
+        email=user.email,
+        password_hash=user.password_hash,
+        cpf=user.cpf,
+        birthday=user.birthday,
+        role_id=user.role_id,
+        id=user.id,
+    )
+
+
+def get_user_import_service(db: AsyncSession = Depends(get_async_db)) -> UserImportService:
+    return UserImportService(db)
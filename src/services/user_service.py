@@ -1,21 +1,26 @@
 from __future__ import annotations
 
-from typing import Optional
+import csv
+import io
+from typing import AsyncIterator, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from src.models.user import User
 from src.models.role import Role
 from src.schemas.user.user_create_schema import UserCreateSchema
 from src.schemas.user.user_update_schema import UserUpdateSchema
-from src.utils.password import PasswordManager
+from src.utils.password_hasher import get_password_hashing_pool
 from fastapi import Depends
-from src.config.settings import get_db
+from src.config.settings import get_async_db
 from src.utils.cpf_validator import CPFValidator
 from src.config.logger import get_logger
 from typing import Optional as _Optional
-from src.models.user import User as _User
-from src.utils.permissions import admin_permission
+from src.utils.permissions import Principal, admin_permission
+from src.utils.principal_cache import get_principal_cache
 from src.exceptions.users.user_exceptions import (
     UserNotFoundException,
     UserAlreadyExistsException,
@@ -23,68 +28,103 @@ from src.exceptions.users.user_exceptions import (
     CpfUpdateNotAllowedException,
     RoleNotFoundForUserException,
 )
+from src.exceptions.auth.auth_exceptions import PasswordHashingOverloadedException
 from src.schemas.user.user_response_schema import UserResponseSchema
 from src.schemas.user.user_read_schema import UserReadSchema
+from src.schemas.user.user_page_schema import UserPageSchema
+from src.exceptions.pagination.pagination_exceptions import InvalidCursorException
+from src.utils.cursor import decode_cursor, encode_cursor
+
+
+EXPORT_CSV_COLUMNS = [
+    "id",
+    "name",
+    "username",
+    "email",
+    "cpf",
+    "birthday",
+    "role_id",
+    "role_name",
+    "created_at",
+    "updated_at",
+]
 
 
 class UserService:
     def __init__(
-        self, db: Session
+        self, db: AsyncSession
     ) -> None:
         self.db = db
-        self.password_manager = PasswordManager()
+        self.password_hasher = get_password_hashing_pool()
         self.cpf_validator = CPFValidator()
         self.logger = get_logger(self.__class__.__name__)
 
-    def _get_by_filter(self, **kwargs) -> Optional[User]:
+    async def _get_by_filter(self, **kwargs) -> Optional[User]:
         try:
             self.logger.info("fetching user by filter: %s", kwargs)
-            return self.db.query(User).filter_by(**kwargs).first()
+            result = await self.db.execute(select(User).filter_by(**kwargs).limit(1))
+            return result.scalars().first()
         except Exception:
             self.logger.exception("error fetching user by filter: %s", kwargs)
             raise
 
-    def get(self, user_id: str) -> Optional[User]:
+    async def get(self, user_id: str) -> Optional[User]:
         try:
             self.logger.info("fetching user by id=%s", user_id)
-            return self.db.get(User, user_id)
+            return await self.db.get(User, user_id, options=[joinedload(User.role)])
         except Exception:
             self.logger.exception("error getting user id=%s", user_id)
             raise
 
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         try:
             self.logger.info("fetching user by email=%s", email)
-            return self._get_by_filter(email=email)
+            return await self._get_by_filter(email=email)
         except Exception:
             self.logger.exception("error getting user by email=%s", email)
             raise
 
-    def get_by_username(self, username: str) -> Optional[User]:
+    async def get_by_username(self, username: str) -> Optional[User]:
         try:
             self.logger.info("fetching user by username=%s", username)
-            return self._get_by_filter(username=username)
+            return await self._get_by_filter(username=username)
         except Exception:
             self.logger.exception("error getting user by username=%s", username)
             raise
 
-    def get_by_cpf(self, cpf: str) -> Optional[User]:
+    async def get_by_cpf(self, cpf: str) -> Optional[User]:
         try:
             self.logger.info("fetching user by cpf=%s", cpf)
-            return self._get_by_filter(cpf=cpf)
+            return await self._get_by_filter(cpf=cpf)
         except Exception:
             self.logger.exception("error getting user by cpf=%s", cpf)
             raise
 
-    def list(self, skip: int = 0, limit: int = 100) -> list[type[User]]:
+    async def list(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[list[User], Optional[str]]:
         try:
-            self.logger.info("listing users skip=%d limit=%d", skip, limit)
-            return self.db.query(User).offset(skip).limit(limit).all()
+            self.logger.info("listing users cursor=%s limit=%d", cursor, limit)
+            query = (
+                select(User)
+                .options(joinedload(User.role))
+                .order_by(User.created_at, User.id)
+                .limit(limit + 1)
+            )
+            after = decode_cursor(cursor)
+            if after is not None:
+                query = query.where(tuple_(User.created_at, User.id) > after)
+            users = list((await self.db.execute(query)).scalars().all())
+            next_cursor = None
+            if len(users) > limit:
+                users = users[:limit]
+                next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+            return users, next_cursor
+        except InvalidCursorException:
+            raise
         except Exception:
-            self.logger.exception("error listing users skip=%d limit=%d", skip, limit)
+            self.logger.exception("error listing users cursor=%s limit=%d", cursor, limit)
             raise
 
-    def create(self, *, user_in: UserCreateSchema, current_user: _Optional[_User] = None) -> User:
+    async def create(self, *, user_in: UserCreateSchema, current_user: _Optional[Principal] = None) -> User:
         try:
             admin_permission.ensure(current_user)
             cpf_clean = self.cpf_validator.clean(user_in.cpf)
@@ -94,21 +134,15 @@ class UserService:
                 self.logger.warning("invalid cpf for username=%s", user_in.username)
                 raise InvalidCpfException(cpf_clean)
             
-            if self.get_by_username(user_in.username):
-                self.logger.warning("attempt to create user with existing username=%s", user_in.username)
-                raise UserAlreadyExistsException("username", user_in.username)
-            
-            if self.get_by_email(user_in.email):
-                self.logger.warning("attempt to create user with existing email=%s", user_in.email)
-                raise UserAlreadyExistsException("email", user_in.email)
-            
-            if self.get_by_cpf(cpf_clean):
-                self.logger.warning("attempt to create user with existing cpf=%s", cpf_clean)
-                raise UserAlreadyExistsException("cpf", cpf_clean)
+            unique_values = {"username": user_in.username, "email": user_in.email, "cpf": cpf_clean}
+            conflict = await self._find_conflict(**unique_values)
+            if conflict:
+                self.logger.warning("attempt to create user with existing %s=%s", *conflict)
+                raise UserAlreadyExistsException(*conflict)
 
-            password_hash = self.password_manager.hash(user_in.password)
+            password_hash = await self.password_hasher.hash(user_in.password)
             if getattr(user_in, "role_id", None) is not None:
-                if user_in.role_id and not self.db.get(Role, user_in.role_id):
+                if user_in.role_id and not await self.db.get(Role, user_in.role_id):
                     self.logger.warning("attempt to create user with non-existing role_id=%s", user_in.role_id)
                     raise RoleNotFoundForUserException(user_in.role_id)
 
@@ -122,52 +156,144 @@ class UserService:
                 role_id=getattr(user_in, "role_id", None),
             )
             self.db.add(user)
-            self.db.commit()
-            self.db.refresh(user)
+            await self._commit_unique(**unique_values)
+            await self._refresh(user)
             self.logger.info("created user id=%s username=%s", getattr(user, "id", None), user.username)
             return user
-        except (UserAlreadyExistsException, InvalidCpfException, RoleNotFoundForUserException):
+        except (UserAlreadyExistsException, InvalidCpfException, RoleNotFoundForUserException, PasswordHashingOverloadedException):
             raise
         except Exception:
             self.logger.exception("error creating user username=%s", getattr(user_in, "username", None))
             raise
 
-    def get_with_validation(self, user_id: str) -> User:
-        user = self.get(user_id)
+    async def _find_conflict(
+        self, exclude_id: Optional[str] = None, **values: Optional[str]
+    ) -> Optional[Tuple[str, str]]:
+        values = {field: value for field, value in values.items() if value is not None}
+        if not values:
+            return None
+        query = select(*(getattr(User, field) for field in values)).where(
+            or_(*(getattr(User, field) == value for field, value in values.items()))
+        )
+        if exclude_id is not None:
+            query = query.where(User.id != exclude_id)
+        rows = (await self.db.execute(query.limit(len(values)))).all()
+        if not rows:
+            return None
+        for field, value in values.items():
+            if any(str(getattr(row, field)).lower() == str(value).lower() for row in rows):
+                return field, value
+        return next(iter(values.items()))
+
+    async def _commit_unique(self, exclude_id: Optional[str] = None, **values: Optional[str]) -> None:
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            conflict = await self._find_conflict(exclude_id=exclude_id, **values)
+            if conflict:
+                self.logger.warning("unique constraint conflict on %s=%s", *conflict)
+                raise UserAlreadyExistsException(*conflict)
+            raise
+
+    async def _refresh(self, user: User) -> None:
+        await self.db.execute(
+            select(User)
+            .options(joinedload(User.role))
+            .where(User.id == user.id)
+            .execution_options(populate_existing=True)
+        )
+
+    async def get_with_validation(self, user_id: str) -> User:
+        user = await self.get(user_id)
         if not user:
             raise UserNotFoundException(user_id)
         return user
 
-    def create_with_response(self, *, user_in: UserCreateSchema, current_user: _Optional[_User] = None) -> UserResponseSchema:
-        user = self.create(user_in=user_in, current_user=current_user)
+    async def create_with_response(self, *, user_in: UserCreateSchema, current_user: _Optional[Principal] = None) -> UserResponseSchema:
+        user = await self.create(user_in=user_in, current_user=current_user)
         return UserResponseSchema(
             message="user created", 
             user=UserReadSchema.from_orm(user)
         )
 
-    def list_with_schema(self, skip: int = 0, limit: int = 100) -> list[UserReadSchema]:
-        users = self.list(skip, limit)
-        return [UserReadSchema.from_orm(u) for u in users]
+    async def list_with_schema(self, cursor: Optional[str] = None, limit: int = 100) -> UserPageSchema:
+        users, next_cursor = await self.list(cursor, limit)
+        return UserPageSchema(
+            items=[UserReadSchema.from_orm(u) for u in users],
+            next_cursor=next_cursor,
+        )
 
-    def get_with_schema(self, user_id: str) -> UserReadSchema:
-        user = self.get_with_validation(user_id)
+    async def get_with_schema(self, user_id: str) -> UserReadSchema:
+        user = await self.get_with_validation(user_id)
         return UserReadSchema.from_orm(user)
 
-    def update_with_validation(
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[list[User]]:
+        try:
+            self.logger.info("streaming all users batch_size=%d", batch_size)
+            result = await self.db.stream(
+                select(User)
+                .options(joinedload(User.role))
+                .order_by(User.created_at, User.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for partition in result.scalars().partitions():
+                yield partition
+                # Drop exported rows one by one: expunge_all() would swap out
+                # the identity map the open result is still loading into.
+                for user in partition:
+                    self.db.expunge(user)
+        except Exception:
+            self.logger.exception("error streaming users batch_size=%d", batch_size)
+            raise
+
+    async def export_ndjson(self, batch_size: int = 1000) -> AsyncIterator[str]:
+        async for users in self.iter_all(batch_size):
+            yield "".join(
+                UserReadSchema.from_orm(u).model_dump_json() + "\n" for u in users
+            )
+
+    async def export_csv(self, batch_size: int = 1000) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        async for users in self.iter_all(batch_size):
+            for u in users:
+                row = UserReadSchema.from_orm(u)
+                writer.writerow([
+                    row.id,
+                    row.name,
+                    row.username,
+                    row.email,
+                    row.cpf,
+                    row.birthday.isoformat(),
+                    row.role.id if row.role else "",
+                    row.role.name if row.role else "",
+                    row.created_at.isoformat(),
+                    row.updated_at.isoformat(),
+                ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    async def update_with_validation(
         self,
         user_id: str,
         user_in: UserUpdateSchema,
-        current_user: _Optional[_User] = None
+        current_user: _Optional[Principal] = None
     ) -> UserReadSchema:
-        user = self.get_with_validation(user_id)
-        updated_user = self.update(user, user_in=user_in, current_user=current_user)
+        user = await self.get_with_validation(user_id)
+        updated_user = await self.update(user, user_in=user_in, current_user=current_user)
         return UserReadSchema.from_orm(updated_user)
 
-    def delete_with_validation(self, user_id: str, current_user: _Optional[_User] = None) -> None:
-        user = self.get_with_validation(user_id)
-        self.delete(user, current_user=current_user)
+    async def delete_with_validation(self, user_id: str, current_user: _Optional[Principal] = None) -> None:
+        user = await self.get_with_validation(user_id)
+        await self.delete(user, current_user=current_user)
 
-    def update(self, user: User, *, user_in: UserUpdateSchema, current_user: _Optional[_User] = None) -> User:
+    async def update(self, user: User, *, user_in: UserUpdateSchema, current_user: _Optional[Principal] = None) -> User:
         try:
             self.logger.info("updating user id=%s", getattr(user, "id", None))
             admin_permission.ensure(current_user)
@@ -181,17 +307,17 @@ class UserService:
                 changed = True
                 
             if user_in.username is not None:
-                existing = self.get_by_username(user_in.username)
+                conflict = await self._find_conflict(exclude_id=user.id, username=user_in.username)
                 
-                if existing and getattr(existing, "id", None) != getattr(user, "id", None):
+                if conflict:
                     self.logger.warning("attempt to update user with existing username=%s", user_in.username)
-                    raise UserAlreadyExistsException("username", user_in.username)
+                    raise UserAlreadyExistsException(*conflict)
                 
                 user.username = user_in.username
                 changed = True
                 
             if getattr(user_in, "role_id", None) is not None:
-                if user_in.role_id and not self.db.get(Role, user_in.role_id):
+                if user_in.role_id and not await self.db.get(Role, user_in.role_id):
                     self.logger.warning("attempt to update user with non-existing role_id=%s", user_in.role_id)
                     raise RoleNotFoundForUserException(user_in.role_id)
                 user.role_id = user_in.role_id
@@ -200,8 +326,9 @@ class UserService:
             if changed:
                 user.touch()
                 self.db.add(user)
-                self.db.commit()
-                self.db.refresh(user)
+                await self._commit_unique(exclude_id=user.id, username=user_in.username)
+                get_principal_cache().invalidate(user.id)
+                await self._refresh(user)
 
             self.logger.info("updated user id=%s", getattr(user, "id", None))
             return user
@@ -211,15 +338,16 @@ class UserService:
             self.logger.exception("error updating user id=%s", getattr(user, "id", None))
             raise
 
-    def delete(self, user: User, current_user: _Optional[_User] = None) -> None:
+    async def delete(self, user: User, current_user: _Optional[Principal] = None) -> None:
         try:
             admin_permission.ensure(current_user)
-            self.db.delete(user)
-            self.db.commit()
+            await self.db.delete(user)
+            await self.db.commit()
+            get_principal_cache().invalidate(user.id)
             self.logger.info("deleted user id=%s", getattr(user, "id", None))
         except Exception:
             self.logger.exception("error deleting user id=%s", getattr(user, "id", None))
             raise
 
-def get_user_service(db: Session = Depends(get_db)) -> UserService:
+def get_user_service(db: AsyncSession = Depends(get_async_db)) -> UserService:
     return UserService(db)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Protocol, Set, Union
+
+from src.config.settings import get_settings
+
+Value = Union[bytes, str, int, float]
+
+SWEEP_EVERY = 1000
+
+
+class KeyValueClient(Protocol):
+    """The subset of redis.asyncio.Redis used by KeyValueTokenStore."""
+
+    async def get(self, name: str) -> Optional[bytes]: ...
+
+    async def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]: ...
+
+    async def set(
+        self, name: str, value: Value, ex: Optional[int] = None, nx: bool = False
+    ) -> Optional[bool]: ...
+
+    async def delete(self, *names: str) -> int: ...
+
+    async def sadd(self, name: str, *values: Value) -> int: ...
+
+    async def srem(self, name: str, *values: Value) -> int: ...
+
+    async def smembers(self, name: str) -> Set[bytes]: ...
+
+    async def expire(self, name: str, seconds: int) -> bool: ...
+
+    async def aclose(self) -> None: ...
+
+
+def _encode(value: Value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class SQLiteKeyValueClient:
+    def __init__(self, path: str = ":memory:") -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv_sets "
+            "(key TEXT NOT NULL, member BLOB NOT NULL, expires_at REAL, PRIMARY KEY (key, member))"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live(self) -> str:
+        return "(expires_at IS NULL OR expires_at > ?)"
+
+    def _expires_at(self, ex: Optional[int]) -> Optional[float]:
+        return time.time() + ex if ex is not None else None
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            now = time.time()
+            self._conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+            self._conn.execute("DELETE FROM kv_sets WHERE expires_at <= ?", (now,))
+
+    async def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM kv WHERE key = ? AND {self._live()}", (name, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    async def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        keys = list(keys)
+        if not keys:
+            return []
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM kv WHERE key IN ({placeholders}) AND {self._live()}",
+                (*keys, time.time()),
+            ).fetchall()
+        found = dict(rows)
+        return [found.get(key) for key in keys]
+
+    async def set(
+        self, name: str, value: Value, ex: Optional[int] = None, nx: bool = False
+    ) -> Optional[bool]:
+        now = time.time()
+        with self._lock:
+            if nx:
+                existing = self._conn.execute(
+                    f"SELECT 1 FROM kv WHERE key = ? AND {self._live()}", (name, now)
+                ).fetchone()
+                if existing:
+                    return None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (name, _encode(value), self._expires_at(ex)),
+            )
+            self._wrote()
+        return True
+
+    async def delete(self, *names: str) -> int:
+        removed = 0
+        with self._lock:
+            for name in names:
+                removed += self._conn.execute("DELETE FROM kv WHERE key = ?", (name,)).rowcount
+                removed += min(
+                    1, self._conn.execute("DELETE FROM kv_sets WHERE key = ?", (name,)).rowcount
+                )
+        return removed
+
+    async def sadd(self, name: str, *values: Value) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT expires_at FROM kv_sets WHERE key = ? AND {self._live()} LIMIT 1",
+                (name, time.time()),
+            ).fetchone()
+            expires_at = row[0] if row else None
+            added = 0
+            for value in values:
+                added += self._conn.execute(
+                    "INSERT OR IGNORE INTO kv_sets (key, member, expires_at) VALUES (?, ?, ?)",
+                    (name, _encode(value), expires_at),
+                ).rowcount
+            self._wrote()
+        return added
+
+    async def srem(self, name: str, *values: Value) -> int:
+        with self._lock:
+            return sum(
+                self._conn.execute(
+                    "DELETE FROM kv_sets WHERE key = ? AND member = ?", (name, _encode(value))
+                ).rowcount
+                for value in values
+            )
+
+    async def smembers(self, name: str) -> Set[bytes]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT member FROM kv_sets WHERE key = ? AND {self._live()}",
+                (name, time.time()),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        expires_at = self._expires_at(seconds)
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE kv SET expires_at = ? WHERE key = ?", (expires_at, name)
+            ).rowcount
+            updated += self._conn.execute(
+                "UPDATE kv_sets SET expires_at = ? WHERE key = ?", (expires_at, name)
+            ).rowcount
+        return updated > 0
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_kv_client(url: str) -> Any:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "TOKEN_KV_URL points at Redis but the 'redis' package is not installed"
+            ) from exc
+        return Redis.from_url(url)
+    if url in ("memory://", "sqlite://", "sqlite:///:memory:"):
+        return SQLiteKeyValueClient(":memory:")
+    if url.startswith("sqlite:///"):
+        return SQLiteKeyValueClient(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported TOKEN_KV_URL: {url}")
+
+
+@lru_cache
+def get_kv_client() -> KeyValueClient:
+    return create_kv_client(get_settings().token_kv_url)
+
+
+async def close_kv_client() -> None:
+    if get_kv_client.cache_info().currsize:
+        await get_kv_client().aclose()
+        get_kv_client.cache_clear()
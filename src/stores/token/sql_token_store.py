@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, exists, false, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.config.settings import get_settings
+from src.models.refresh_token import RefreshToken
+from src.stores.token.token_store import TokenStore
+
+
+class SqlTokenStore(TokenStore):
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        settings = get_settings()
+        self.binary_hashes = settings.token_hash_storage == "binary"
+        self.legacy_read = settings.token_hash_legacy_read
+
+    def _hash_columns(self, digest: bytes) -> Dict[str, Any]:
+        if self.binary_hashes:
+            return {"token_hash": None, "token_digest": digest}
+        return {"token_hash": digest.hex(), "token_digest": None}
+
+    async def _get_where(self, condition) -> Optional[RefreshToken]:
+        result = await self.db.execute(select(RefreshToken).where(condition).limit(1))
+        return result.scalars().first()
+
+    async def get(self, digest: bytes) -> Optional[RefreshToken]:
+        if not self.binary_hashes:
+            return await self._get_where(RefreshToken.token_hash == digest.hex())
+        # One unique-index probe per column; the hex fallback only serves rows
+        # written before binary storage and can be switched off once the
+        # f5c1a7e9b3d2 backfill has run (TOKEN_HASH_LEGACY_READ=false).
+        token = await self._get_where(RefreshToken.token_digest == digest)
+        if token is None and self.legacy_read:
+            token = await self._get_where(RefreshToken.token_hash == digest.hex())
+        return token
+
+    async def add(self, token: RefreshToken, digest: bytes) -> None:
+        for column, value in self._hash_columns(digest).items():
+            setattr(token, column, value)
+        self.db.add(token)
+        await self.db.commit()
+        await self.db.refresh(token)
+
+    async def revoke(self, token: RefreshToken, digest: bytes, now: datetime) -> None:
+        token.revoked = True
+        token.rotated_at = now
+        self.db.add(token)
+        await self.db.commit()
+
+    async def claim_and_replace(
+        self,
+        token: RefreshToken,
+        digest: bytes,
+        new_token: RefreshToken,
+        new_digest: bytes,
+        now: datetime,
+    ) -> bool:
+        claimed = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == token.id, RefreshToken.revoked == false())
+            .values(revoked=True, rotated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            await self.db.rollback()
+            return False
+        for column, value in self._hash_columns(new_digest).items():
+            setattr(new_token, column, value)
+        self.db.add(new_token)
+        await self.db.commit()
+        return True
+
+    async def revoke_family(
+        self, user_id: str, device_id: Optional[str], now: datetime
+    ) -> int:
+        query = update(RefreshToken).where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked == false(),
+        )
+        if device_id:
+            query = query.where(RefreshToken.device_id == device_id)
+        result = await self.db.execute(
+            query.values(revoked=True, rotated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def purge(
+        self,
+        retention: timedelta,
+        batch_size: int,
+        pause_seconds: float,
+        max_batches: Optional[int],
+    ) -> Tuple[int, int]:
+        cutoff = datetime.now(timezone.utc) - retention
+        removed = 0
+        batches = 0
+        # Two passes, each a range scan on its own index, rather than an OR
+        # the planner may resolve with a full scan of refresh_tokens.
+        passes = [
+            RefreshToken.expires_at < cutoff,
+            and_(RefreshToken.revoked == true(), RefreshToken.rotated_at < cutoff),
+        ]
+        try:
+            while passes and (max_batches is None or batches < max_batches):
+                ids = (
+                    await self.db.execute(
+                        select(RefreshToken.id).where(passes[0]).limit(batch_size)
+                    )
+                ).scalars().all()
+                if not ids:
+                    passes.pop(0)
+                    continue
+                await self.db.execute(
+                    update(RefreshToken)
+                    .where(RefreshToken.rotated_from.in_(ids))
+                    .values(rotated_from=None)
+                    .execution_options(synchronize_session=False)
+                )
+                result = await self.db.execute(
+                    delete(RefreshToken)
+                    .where(RefreshToken.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                await self.db.commit()
+                removed += result.rowcount
+                batches += 1
+                if len(ids) < batch_size:
+                    passes.pop(0)
+                    continue
+                if pause_seconds > 0:
+                    await asyncio.sleep(pause_seconds)
+            return removed, batches
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def revoked_digests(self, limit: int) -> List[bytes]:
+        # Only tokens whose whole user/device family is already revoked: a
+        # replayed token with a live successor must still reach rotate() so
+        # reuse detection can revoke that successor.
+        live = aliased(RefreshToken)
+        live_sibling = exists().where(
+            live.user_id == RefreshToken.user_id,
+            live.revoked == false(),
+            or_(RefreshToken.device_id.is_(None), live.device_id == RefreshToken.device_id),
+        )
+        rows = await self.db.execute(
+            select(RefreshToken.token_hash, RefreshToken.token_digest)
+            .where(RefreshToken.revoked == true(), ~live_sibling)
+            .order_by(RefreshToken.rotated_at.desc())
+            .limit(limit)
+        )
+        return [
+            digest if digest is not None else bytes.fromhex(token_hash)
+            for token_hash, digest in rows.all()
+        ]
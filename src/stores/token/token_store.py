@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from src.models.refresh_token import RefreshToken
+
+
+class TokenStore(ABC):
+    @abstractmethod
+    async def get(self, digest: bytes) -> Optional[RefreshToken]:
+        ...
+
+    @abstractmethod
+    async def add(self, token: RefreshToken, digest: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def revoke(self, token: RefreshToken, digest: bytes, now: datetime) -> None:
+        ...
+
+    @abstractmethod
+    async def claim_and_replace(
+        self,
+        token: RefreshToken,
+        digest: bytes,
+        new_token: RefreshToken,
+        new_digest: bytes,
+        now: datetime,
+    ) -> bool:
+        ...
+
+    @abstractmethod
+    async def revoke_family(
+        self, user_id: str, device_id: Optional[str], now: datetime
+    ) -> int:
+        ...
+
+    @abstractmethod
+    async def purge(
+        self,
+        retention: timedelta,
+        batch_size: int,
+        pause_seconds: float,
+        max_batches: Optional[int],
+    ) -> Tuple[int, int]:
+        ...
+
+    @abstractmethod
+    async def revoked_digests(self, limit: int) -> List[bytes]:
+        ...
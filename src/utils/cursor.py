@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from src.exceptions.pagination.pagination_exceptions import InvalidCursorException
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+
+
+__all__ = ["encode_cursor", "decode_cursor"]
@@ -22,6 +22,7 @@ async def service_exception_handler(request: Request, exc: BaseServiceException)
             "error": exc.message,
             "detail": exc.detail,
         },
+        headers=exc.headers,
     )
 
 async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
@@ -38,6 +39,7 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
             "detail": exc.detail,
             "type": "HTTPException",
         },
+        headers=exc.headers,
     )
 
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Dict, Optional
 from datetime import datetime, timedelta
 
@@ -38,3 +39,8 @@ class JwtManager:
             return payload
         except JWTError as exc:
             raise ValueError("token is invalid") from exc
+
+
+@lru_cache
+def get_jwt_manager() -> JwtManager:
+    return JwtManager()
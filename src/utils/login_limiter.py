@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from src.config.settings import get_settings
+from src.exceptions.auth.auth_exceptions import LoginThrottledException
+from src.stores.token.kv_client import KeyValueClient, get_kv_client
+
+
+@dataclass
+class LimiterState:
+    tokens: float
+    updated: float
+    failures: float = 0.0
+    blocked_until: float = 0.0
+
+
+class LimiterBackend(Protocol):
+    async def load(self, key: str) -> Optional[LimiterState]: ...
+
+    async def save(self, key: str, state: LimiterState, ttl: int) -> None: ...
+
+
+class MemoryLimiterBackend:
+    def __init__(self, max_keys: int = 100000) -> None:
+        self.max_keys = max(1, max_keys)
+        self._entries: OrderedDict[str, Tuple[float, LimiterState]] = OrderedDict()
+
+    async def load(self, key: str) -> Optional[LimiterState]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        return LimiterState(**asdict(state))
+
+    async def save(self, key: str, state: LimiterState, ttl: int) -> None:
+        self._entries[key] = (time.time() + ttl, state)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class KeyValueLimiterBackend:
+    # Read-modify-write without a lock: concurrent workers may each admit
+    # one extra attempt, which is acceptable for throttling.
+    def __init__(self, client: KeyValueClient, prefix: str = "login_limit") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def load(self, key: str) -> Optional[LimiterState]:
+        raw = await self.client.get(f"{self.prefix}:{key}")
+        return LimiterState(**json.loads(raw)) if raw else None
+
+    async def save(self, key: str, state: LimiterState, ttl: int) -> None:
+        await self.client.set(f"{self.prefix}:{key}", json.dumps(asdict(state)), ex=ttl)
+
+
+@dataclass
+class BucketPolicy:
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+class LoginLimiter:
+    def __init__(
+        self,
+        backend: LimiterBackend,
+        username_policy: BucketPolicy,
+        ip_policy: BucketPolicy,
+        backoff_after_failures: int = 5,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 900.0,
+        failure_window_seconds: float = 900.0,
+    ) -> None:
+        self.backend = backend
+        self.policies = {"username": username_policy, "ip": ip_policy}
+        self.backoff_after_failures = max(1, backoff_after_failures)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        # Failures leak away so that backoff_after_failures of them are
+        # forgotten per window: occasional typos behind a shared IP never add
+        # up, while a burst still trips the backoff.
+        self.failure_decay_per_second = self.backoff_after_failures / max(1.0, failure_window_seconds)
+        self.processed = 0
+        self.rejected: Dict[str, int] = {"username": 0, "ip": 0}
+
+    def _keys(self, username: Optional[str], ip: Optional[str]) -> List[Tuple[str, str]]:
+        keys: List[Tuple[str, str]] = []
+        if username and self.policies["username"].per_minute > 0:
+            keys.append(("username", f"username:{username.strip().lower()}"))
+        if ip and self.policies["ip"].per_minute > 0:
+            keys.append(("ip", f"ip:{ip}"))
+        return keys
+
+    def _refill(self, scope: str, state: Optional[LimiterState], now: float) -> LimiterState:
+        policy = self.policies[scope]
+        if state is None:
+            return LimiterState(tokens=float(policy.burst), updated=now)
+        elapsed = max(0.0, now - state.updated)
+        state.tokens = min(float(policy.burst), state.tokens + elapsed * policy.rate)
+        if state.failures:
+            state.failures = max(0.0, state.failures - elapsed * self.failure_decay_per_second)
+        state.updated = now
+        return state
+
+    def _ttl(self, scope: str, state: LimiterState, now: float) -> int:
+        policy = self.policies[scope]
+        ttl = policy.burst / policy.rate
+        if state.failures:
+            ttl = max(ttl, state.failures / self.failure_decay_per_second, state.blocked_until - now)
+        return max(1, math.ceil(ttl))
+
+    async def check(self, username: Optional[str], ip: Optional[str]) -> None:
+        now = time.time()
+        keys = self._keys(username, ip)
+        states: List[Tuple[str, str, LimiterState]] = []
+        for scope, key in keys:
+            state = self._refill(scope, await self.backend.load(key), now)
+            retry_after = 0.0
+            if state.blocked_until > now:
+                retry_after = state.blocked_until - now
+            elif state.tokens < 1:
+                retry_after = (1 - state.tokens) / self.policies[scope].rate
+            if retry_after > 0:
+                self.rejected[scope] += 1
+                raise LoginThrottledException(retry_after)
+            states.append((scope, key, state))
+
+        for scope, key, state in states:
+            state.tokens -= 1
+            await self.backend.save(key, state, self._ttl(scope, state, now))
+        self.processed += 1
+
+    async def record_failure(self, username: Optional[str], ip: Optional[str]) -> None:
+        now = time.time()
+        for scope, key in self._keys(username, ip):
+            state = self._refill(scope, await self.backend.load(key), now)
+            state.failures += 1
+            excess = math.floor(state.failures) - self.backoff_after_failures
+            if excess >= 0:
+                delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** excess)
+                state.blocked_until = now + delay
+            await self.backend.save(key, state, self._ttl(scope, state, now))
+
+    async def record_success(self, username: Optional[str], ip: Optional[str]) -> None:
+        # Only the account is forgiven; a shared IP keeps its failure history.
+        now = time.time()
+        for scope, key in self._keys(username, None):
+            state = await self.backend.load(key)
+            if state is None or not state.failures:
+                continue
+            state.failures = 0.0
+            state.blocked_until = 0.0
+            await self.backend.save(key, state, self._ttl(scope, state, now))
+
+    def stats(self) -> Dict[str, int]:
+        stats = {
+            "processed": self.processed,
+            "rejected_username": self.rejected["username"],
+            "rejected_ip": self.rejected["ip"],
+            "rejected": sum(self.rejected.values()),
+        }
+        if isinstance(self.backend, MemoryLimiterBackend):
+            stats["tracked_keys"] = len(self.backend)
+        return stats
+
+
+@lru_cache
+def get_login_limiter() -> LoginLimiter:
+    settings = get_settings()
+    if settings.login_rate_limit_backend == "kv":
+        backend: LimiterBackend = KeyValueLimiterBackend(get_kv_client())
+    else:
+        backend = MemoryLimiterBackend(settings.login_rate_limit_max_keys)
+    return LoginLimiter(
+        backend,
+        username_policy=BucketPolicy(
+            settings.login_rate_limit_per_minute, settings.login_rate_limit_burst
+        ),
+        ip_policy=BucketPolicy(
+            settings.login_ip_rate_limit_per_minute, settings.login_ip_rate_limit_burst
+        ),
+        backoff_after_failures=settings.login_backoff_after_failures,
+        backoff_base_seconds=settings.login_backoff_base_seconds,
+        backoff_max_seconds=settings.login_backoff_max_seconds,
+        failure_window_seconds=settings.login_failure_window_seconds,
+    )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence
+
+from src.config.settings import get_settings
+from src.exceptions.auth.auth_exceptions import PasswordHashingOverloadedException
+from src.metrics.instruments import PASSWORD_VERIFY_DURATION
+from src.utils.password import PasswordManager
+
+
+class PasswordHashingPool:
+    def __init__(
+        self,
+        password_manager: Optional[PasswordManager] = None,
+        max_workers: int = 4,
+        max_pending: int = 64,
+    ) -> None:
+        self.password_manager = password_manager or PasswordManager()
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="password-hash",
+        )
+        self._in_flight = 0
+        self._dummy_hash: Optional[str] = None
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.max_workers + self.max_pending:
+            self.rejected += 1
+            raise PasswordHashingOverloadedException()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.password_manager.hash, password)
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        hashed: List[str] = []
+        for start in range(0, len(passwords), self.max_workers):
+            chunk = passwords[start:start + self.max_workers]
+            hashed.extend(await asyncio.gather(*(self.hash(p) for p in chunk)))
+        return hashed
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        started = time.perf_counter()
+        result = await self._run(self.password_manager.verify, plain, hashed)
+        PASSWORD_VERIFY_DURATION.observe(time.perf_counter() - started)
+        return result
+
+    async def dummy_hash(self) -> str:
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(32))
+        return self._dummy_hash
+
+    async def verify_dummy(self, plain: str) -> None:
+        # Same cost as a real verify, so a missing account is not a timing oracle.
+        await self.verify(plain, await self.dummy_hash())
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_password_hashing_pool() -> PasswordHashingPool:
+    settings = get_settings()
+    return PasswordHashingPool(
+        max_workers=settings.password_hash_max_workers,
+        max_pending=settings.password_hash_max_pending,
+    )
+
+
+def shutdown_password_hashing_pool() -> None:
+    if get_password_hashing_pool.cache_info().currsize:
+        get_password_hashing_pool().shutdown()
+        get_password_hashing_pool.cache_clear()
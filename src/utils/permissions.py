@@ -1,27 +1,35 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Union
 
 from fastapi import Depends
 
 from src.models.user import User
-from src.services.auth_service import get_current_user
+from src.schemas.auth.principal_schema import PrincipalSchema
+from src.services.auth_service import get_current_principal
 from src.exceptions.auth.auth_exceptions import AdminPrivilegesRequiredException
 
+Principal = Union[User, PrincipalSchema]
+
+
+def _role_name(principal: Principal) -> Optional[str]:
+    if isinstance(principal, PrincipalSchema):
+        return principal.role
+    role = getattr(principal, "role", None)
+    return getattr(role, "name", None)
+
 
 class AdminPermission:
-    async def __call__(self, current_user: User = Depends(get_current_user)) -> User:
-        role = getattr(current_user, "role", None)
-        name = getattr(role, "name", None)
-        if not name or name.lower() != "admin":
-            raise AdminPrivilegesRequiredException()
+    async def __call__(
+        self, current_user: PrincipalSchema = Depends(get_current_principal)
+    ) -> PrincipalSchema:
+        self.ensure(current_user)
         return current_user
 
-    def ensure(self, user: Optional[User]) -> None:
+    def ensure(self, user: Optional[Principal]) -> None:
         if not user:
             raise AdminPrivilegesRequiredException()
-        role = getattr(user, "role", None)
-        name = getattr(role, "name", None)
+        name = _role_name(user)
         if not name or name.lower() != "admin":
             raise AdminPrivilegesRequiredException()
 
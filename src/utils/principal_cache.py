@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from src.config.settings import get_settings
+from src.schemas.auth.principal_schema import PrincipalSchema
+
+
+class PrincipalCache:
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 30.0) -> None:
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        # Plain snapshots, never ORM rows: entries outlive the request session
+        # and are handed to concurrent requests.
+        self._entries: OrderedDict[str, Tuple[float, PrincipalSchema]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, sub: str) -> Optional[PrincipalSchema]:
+        with self._lock:
+            entry = self._entries.get(sub)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._entries[sub]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sub)
+            self.hits += 1
+            return principal.model_copy()
+
+    def put(self, sub: str, principal: PrincipalSchema) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[sub] = (time.monotonic() + self.ttl_seconds, principal.model_copy())
+            self._entries.move_to_end(sub)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, sub: str) -> None:
+        with self._lock:
+            self._entries.pop(str(sub), None)
+
+    def invalidate_role(self, role_id: str) -> None:
+        with self._lock:
+            stale = [
+                sub for sub, (_, principal) in self._entries.items()
+                if principal.role_id == str(role_id)
+            ]
+            for sub in stale:
+                del self._entries[sub]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@lru_cache
+def get_principal_cache() -> PrincipalCache:
+    settings = get_settings()
+    return PrincipalCache(
+        max_size=settings.principal_cache_max_size,
+        ttl_seconds=settings.principal_cache_ttl_seconds,
+    )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config.settings import get_settings
+
+RotationResult = Tuple[str, str]
+
+
+class RefreshCoalescer:
+    def __init__(self, grace_seconds: float = 10.0, max_entries: int = 10000) -> None:
+        self.grace_seconds = grace_seconds
+        self.max_entries = max(1, max_entries)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._recent: OrderedDict[str, Tuple[float, RotationResult]] = OrderedDict()
+        self.coalesced = 0
+
+    def _recent_result(self, key: str) -> RotationResult | None:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._recent[key]
+            return None
+        return result
+
+    def _remember(self, key: str, result: RotationResult) -> None:
+        self._recent[key] = (time.monotonic() + self.grace_seconds, result)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    async def run(
+        self,
+        key: str,
+        rotate: Callable[[], Awaitable[RotationResult]],
+        revalidate: Optional[Callable[[RotationResult], Awaitable[bool]]] = None,
+    ) -> RotationResult:
+        if self.grace_seconds <= 0:
+            return await rotate()
+
+        recent = self._recent_result(key)
+        if recent is not None:
+            # A replay after the rotation finished is not in flight any more;
+            # only hand out the successor while its family is still live, so
+            # reuse detection keeps working for a stolen cookie.
+            if revalidate is None or await revalidate(recent):
+                self.coalesced += 1
+                return recent
+            self._recent.pop(key, None)
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await rotate()
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._remember(key, result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+
+@lru_cache
+def get_refresh_coalescer() -> RefreshCoalescer:
+    return RefreshCoalescer(grace_seconds=get_settings().refresh_grace_seconds)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from src.config.settings import get_settings
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = max(1, capacity)
+        self.error_rate = min(max(error_rate, 1e-9), 0.5)
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+        # Keys are SHA-256 digests, so two 64-bit slices are independent enough
+        # for double hashing.
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest: bytes) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class RefreshTokenFilter:
+    def __init__(
+        self,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        missing_ttl_seconds: float = 60.0,
+        missing_max_size: int = 10000,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.missing_ttl_seconds = missing_ttl_seconds
+        self.missing_max_size = max(1, missing_max_size)
+        self._revoked = BloomFilter(capacity, error_rate)
+        # The previous generation, kept after a rotation so recently revoked
+        # digests stay covered while the new one fills up.
+        self._previous: Optional[BloomFilter] = None
+        self._missing: OrderedDict[bytes, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.revoked_hits = 0
+        self.false_positives = 0
+        self.missing_hits = 0
+        self.passed = 0
+        self.rotations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def rebuild(self, revoked_digests: Iterable[bytes]) -> int:
+        revoked = BloomFilter(self.capacity, self.error_rate)
+        for digest in revoked_digests:
+            revoked.add(digest)
+        with self._lock:
+            self._revoked = revoked
+            self._previous = None
+            self._missing.clear()
+        return revoked.count
+
+    def add_revoked(self, digest: bytes) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._revoked.count >= self.capacity:
+                # Past capacity the false-positive rate climbs without bound;
+                # start a fresh generation instead of overfilling this one.
+                self._previous = self._revoked
+                self._revoked = BloomFilter(self.capacity, self.error_rate)
+                self.rotations += 1
+            self._revoked.add(digest)
+            self._missing.pop(digest, None)
+
+    def add_missing(self, digest: bytes) -> None:
+        if not self.enabled or self.missing_ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._missing[digest] = time.monotonic() + self.missing_ttl_seconds
+            self._missing.move_to_end(digest)
+            while len(self._missing) > self.missing_max_size:
+                self._missing.popitem(last=False)
+
+    def is_known_missing(self, digest: bytes) -> bool:
+        # Exact membership, so a hit is safe to answer without the database.
+        if not self.enabled:
+            return False
+        with self._lock:
+            expires_at: Optional[float] = self._missing.get(digest)
+            if expires_at is not None:
+                if expires_at > time.monotonic():
+                    self.missing_hits += 1
+                    return True
+                del self._missing[digest]
+            return False
+
+    def may_be_revoked(self, digest: bytes) -> bool:
+        # Probabilistic: a hit is only a hint and must be confirmed by the
+        # stored row before a token is rejected.
+        if not self.enabled:
+            return False
+        with self._lock:
+            if digest in self._revoked or (self._previous is not None and digest in self._previous):
+                return True
+            self.passed += 1
+            return False
+
+    def record_revoked_hit(self, confirmed: bool) -> None:
+        with self._lock:
+            if confirmed:
+                self.revoked_hits += 1
+            else:
+                self.false_positives += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            missing_bytes = sys.getsizeof(self._missing) + sum(
+                sys.getsizeof(digest) for digest in self._missing
+            )
+            previous = self._previous.count if self._previous is not None else 0
+            return {
+                "revoked_entries": self._revoked.count + previous,
+                "revoked_capacity": self._revoked.capacity,
+                "revoked_bits": self._revoked.size,
+                "revoked_hashes": self._revoked.hashes,
+                "revoked_memory_bytes": self._revoked.memory_bytes * (2 if self._previous else 1),
+                "revoked_false_positive_rate": self._revoked.estimated_false_positive_rate(),
+                "missing_entries": len(self._missing),
+                "missing_memory_bytes": missing_bytes,
+                "revoked_hits": self.revoked_hits,
+                "revoked_false_positives": self.false_positives,
+                "revoked_rotations": self.rotations,
+                "missing_hits": self.missing_hits,
+                "passed": self.passed,
+            }
+
+
+@lru_cache
+def get_refresh_token_filter() -> RefreshTokenFilter:
+    settings = get_settings()
+    return RefreshTokenFilter(
+        capacity=settings.refresh_token_filter_capacity,
+        error_rate=settings.refresh_token_filter_error_rate,
+        missing_ttl_seconds=settings.refresh_token_missing_ttl_seconds,
+        missing_max_size=settings.refresh_token_missing_max_size,
+    )
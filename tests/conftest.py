@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import date
+
+_DB_DIR = tempfile.mkdtemp(prefix="app-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-that-is-long-enough")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRES_MINUTES", "15")
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("JWT_REFRESH_TOKEN_EXPIRES_DAYS", "7")
+os.environ.setdefault("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ.setdefault("JWT_REFRESH_COOKIE_NAME", "refresh_token")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from src.config.settings import (
+    Base,
+    dispose_async_engine,
+    get_async_engine,
+    get_async_sessionmaker,
+    get_engine,
+    get_sessionmaker,
+)
+from src.metrics.sql_instrumentation import count_queries
+from src.models.role import Role
+from src.models.user import User
+from src.utils.password import PasswordManager
+from src.utils.principal_cache import get_principal_cache
+from src.utils.login_limiter import get_login_limiter
+from src.utils.token_filter import get_refresh_token_filter
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "max_queries(n): fail if the test issues more than n SQL statements"
+    )
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def database():
+    engine = get_engine()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    get_refresh_token_filter.cache_clear()
+    get_login_limiter.cache_clear()
+    get_principal_cache.cache_clear()
+    yield engine
+
+
+ADMIN_PASSWORD = "password123"
+
+
+def valid_cpf(seed: int) -> str:
+    digits = [int(d) for d in f"{seed:09d}"]
+    for length in (9, 10):
+        total = sum(d * w for d, w in zip(digits, range(length + 1, 1, -1)))
+        digits.append(0 if total % 11 < 2 else 11 - total % 11)
+    return "".join(map(str, digits))
+
+
+def seed_users(count: int, role_id=None, prefix: str = "user", own_roles: bool = False):
+    session = get_sessionmaker()()
+    try:
+        if own_roles:
+            roles = [Role(name=f"{prefix}-role-{i}", description="seeded") for i in range(count)]
+            session.add_all(roles)
+            session.commit()
+        users = [
+            User(
+                name=f"{prefix} {i}",
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@example.com",
+                password_hash="x",
+                cpf=f"{prefix}-{i:05d}",
+                birthday=date(1990, 1, 1),
+                role_id=roles[i].id if own_roles else role_id,
+            )
+            for i in range(count)
+        ]
+        session.add_all(users)
+        session.commit()
+        return [user.id for user in users]
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin_user(database):
+    session = get_sessionmaker()()
+    try:
+        role = Role(name="admin", description="administrators")
+        session.add(role)
+        session.commit()
+        admin = User(
+            name="Admin",
+            username="admin",
+            email="admin@example.com",
+            password_hash=PasswordManager().hash(ADMIN_PASSWORD),
+            cpf="52998224725",
+            birthday=date(1990, 1, 1),
+            role_id=role.id,
+        )
+        session.add(admin)
+        session.commit()
+        return admin
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(database):
+    with TestClient(main.app, base_url="https://testserver") as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin_headers(client, admin_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": admin_user.username, "password": ADMIN_PASSWORD},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def query_stats(request, database):
+    """Count SQL statements in the test; enforces ``@pytest.mark.max_queries(n)``."""
+    with count_queries(database, get_async_engine().sync_engine) as stats:
+        yield stats
+    marker = request.node.get_closest_marker("max_queries")
+    if marker is not None:
+        limit = marker.args[0]
+        assert stats.count <= limit, (
+            f"expected at most {limit} queries, got {stats.count}:\n"
+            + "\n".join(f"{n}x {sql}" for sql, n in stats.statements.most_common())
+        )
+
+
+@pytest.fixture
+async def session_factory():
+    yield get_async_sessionmaker()
+    # aiosqlite connections are bound to the loop that opened them.
+    await dispose_async_engine()
+    get_async_sessionmaker.cache_clear()
+    get_async_engine.cache_clear()
+
+
+@pytest.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+
+import anyio
+import pytest
+from sqlalchemy import event
+
+from src.config.settings import get_async_engine, get_async_sessionmaker, get_engine
+from src.exceptions.auth.auth_exceptions import InvalidCredentialsException
+from src.services.auth_service import MAX_IDENTIFIER_LENGTH, MAX_PASSWORD_LENGTH, AuthService
+from src.services.token_service import TokenService
+from tests.conftest import ADMIN_PASSWORD, seed_users
+
+pytestmark = pytest.mark.anyio
+
+
+@contextmanager
+def _captured_statements():
+    engine = get_async_engine().sync_engine
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _plan(statement, parameters):
+    with get_engine().connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def _assert_unique_index_probe(statement, parameters, column):
+    plan = _plan(statement, parameters)
+    users = [step for step in plan if " users " in f" {step} "]
+    assert users, plan
+    assert all(step.startswith("SEARCH") for step in users), plan
+    assert any(f"({column}=?)" in step for step in users), plan
+    assert not any("MULTI-INDEX OR" in step for step in plan), plan
+
+
+@pytest.mark.parametrize(
+    ("identifier", "columns"),
+    [
+        ("user3", ["username"]),
+        ("user3@example.com", ["email"]),
+        ("nobody@example.com", ["email", "username"]),
+    ],
+)
+async def test_login_lookup_probes_one_unique_index_per_query(db, identifier, columns):
+    seed_users(50)
+
+    with _captured_statements() as captured:
+        user = await AuthService(db)._find_login_user(identifier)
+
+    assert (user is None) == identifier.startswith("nobody")
+    assert len(captured) == len(columns)
+    for (statement, parameters), column in zip(captured, columns):
+        _assert_unique_index_probe(statement, parameters, column)
+
+
+@pytest.fixture
+def hasher_calls(monkeypatch):
+    service_calls = []
+
+    def record(service):
+        hasher = service.password_hasher
+        for name in ("verify", "verify_dummy"):
+            original = getattr(hasher, name)
+
+            async def wrapper(*args, _name=name, _original=original):
+                service_calls.append(_name)
+                return await _original(*args)
+
+            monkeypatch.setattr(hasher, name, wrapper)
+        return service
+
+    record.calls = service_calls
+    return record
+
+
+async def test_unknown_user_still_pays_for_a_password_verify(db, hasher_calls):
+    service = hasher_calls(AuthService(db))
+
+    with pytest.raises(InvalidCredentialsException):
+        await service.authenticate_user("nobody@example.com", "password123")
+
+    assert hasher_calls.calls == ["verify_dummy", "verify"]
+
+
+@pytest.mark.parametrize(
+    ("identifier", "password"),
+    [
+        ("", "password123"),
+        ("   ", "password123"),
+        ("user\x00name", "password123"),
+        ("user\nname", "password123"),
+        ("u" * (MAX_IDENTIFIER_LENGTH + 1), "password123"),
+        ("user1", ""),
+        ("user1", "p" * (MAX_PASSWORD_LENGTH + 1)),
+    ],
+)
+async def test_malformed_login_is_rejected_before_database_or_hasher(db, hasher_calls, identifier, password):
+    service = hasher_calls(AuthService(db))
+
+    with _captured_statements() as captured:
+        with pytest.raises(InvalidCredentialsException):
+            await service.authenticate_user(identifier, password)
+
+    assert captured == []
+    assert hasher_calls.calls == []
+
+
+def test_failed_login_does_not_log_an_error(client, admin_user, caplog):
+    with caplog.at_level(logging.INFO):
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": admin_user.username, "password": "wrong-password"},
+        )
+
+    assert response.status_code == 401
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+def _refresh(client, raw_refresh):
+    client.cookies.set("refresh_token", raw_refresh, domain="testserver.local")
+    csrf = client.cookies.get("csrf_refresh_token")
+    return client.post("/api/v1/auth/refresh", headers={"x-csrf-token": csrf, "x-device-id": "d1"})
+
+
+def test_replayed_refresh_cookie_is_refused_once_the_family_is_revoked(client, admin_user):
+    client.post(
+        "/api/v1/auth/login",
+        data={"username": admin_user.username, "password": ADMIN_PASSWORD},
+        headers={"x-device-id": "d1"},
+    )
+    original = client.cookies.get("refresh_token")
+
+    assert _refresh(client, original).status_code == 200
+    successor = client.cookies.get("refresh_token")
+    # A retry inside the grace window gets the same successor.
+    assert _refresh(client, original).status_code == 200
+    assert client.cookies.get("refresh_token") == successor
+
+    anyio.run(_revoke_family, admin_user.id)
+
+    assert _refresh(client, original).status_code == 401
+
+
+async def _revoke_family(user_id):
+    async with get_async_sessionmaker()() as db:
+        await TokenService(db).revoke_all_for_user_and_device(user_id, "d1")
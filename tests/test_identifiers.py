@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select, text
+
+from src.config.settings import get_settings
+from src.models.base import identifiers
+from src.models.base.identifiers import BinaryUUID, new_id, verify_id_storage
+
+
+def test_verify_id_storage_accepts_matching_schema(database):
+    verify_id_storage(database)
+
+
+def test_verify_id_storage_rejects_mismatched_schema(monkeypatch):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id BLOB PRIMARY KEY)"))
+    monkeypatch.setattr(get_settings(), "id_storage", "string")
+
+    with pytest.raises(RuntimeError, match="users.id is stored as binary"):
+        verify_id_storage(engine)
+
+
+@pytest.mark.parametrize("column_type", [String(36), BinaryUUID()], ids=["string", "binary"])
+def test_uuid7_ids_sort_by_creation_time_in_both_storage_modes(monkeypatch, column_type):
+    # Several ids per millisecond exercise the counter, not just the timestamp.
+    ticks = iter(range(1_700_000_000_000_000_000, 1_700_000_000_050_000_000, 250_000))
+    monkeypatch.setattr(identifiers.time, "time_ns", lambda: next(ticks))
+    monkeypatch.setattr(get_settings(), "id_strategy", "uuid7")
+    created = [new_id() for _ in range(200)]
+
+    engine = create_engine("sqlite://")
+    table = Table("ids", MetaData(), Column("id", column_type, primary_key=True), Column("seq", Integer))
+    table.metadata.create_all(engine)
+    shuffled = list(enumerate(created))
+    random.Random(9).shuffle(shuffled)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [{"id": value, "seq": seq} for seq, value in shuffled])
+        ordered = conn.execute(select(table.c.id).order_by(table.c.id)).scalars().all()
+
+    assert ordered == created
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.models.refresh_token import RefreshToken
+from src.services.token_service import TokenService
+from src.stores.token.kv_client import SQLiteKeyValueClient
+from src.stores.token.kv_token_store import KeyValueTokenStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def store():
+    client = SQLiteKeyValueClient(":memory:")
+    yield KeyValueTokenStore(client)
+    await client.aclose()
+
+
+def _token(user_id: str, device_id: str = "d1", **kwargs) -> RefreshToken:
+    now = datetime.now(timezone.utc)
+    return RefreshToken(
+        user_id=user_id,
+        jti=uuid.uuid4().hex,
+        device_id=device_id,
+        expires_at=now + timedelta(days=1),
+        created_at=now,
+        **kwargs,
+    )
+
+
+def _digest(label: str) -> bytes:
+    return hashlib.sha256(label.encode()).digest()
+
+
+async def test_get_round_trips_a_stored_token(store):
+    user_id = str(uuid.uuid4())
+    token = _token(user_id, ip="10.0.0.1", user_agent="pytest")
+
+    await store.add(token, _digest("a"))
+    loaded = await store.get(_digest("a"))
+
+    assert loaded is not None
+    assert (loaded.id, loaded.user_id, loaded.jti) == (token.id, user_id, token.jti)
+    assert (loaded.device_id, loaded.ip, loaded.user_agent) == ("d1", "10.0.0.1", "pytest")
+    assert loaded.expires_at == token.expires_at
+    assert loaded.revoked is False and loaded.rotated_at is None
+    assert await store.get(_digest("missing")) is None
+
+
+async def test_claim_and_replace_succeeds_once(store):
+    user_id = str(uuid.uuid4())
+    old = _token(user_id)
+    await store.add(old, _digest("old"))
+    now = datetime.now(timezone.utc)
+
+    first = await store.claim_and_replace(old, _digest("old"), _token(user_id), _digest("new1"), now)
+    second = await store.claim_and_replace(old, _digest("old"), _token(user_id), _digest("new2"), now)
+
+    assert (first, second) == (True, False)
+    claimed = await store.get(_digest("old"))
+    assert claimed.revoked is True and claimed.rotated_at == now
+    assert (await store.get(_digest("new1"))).revoked is False
+    assert await store.get(_digest("new2")) is None
+
+
+async def test_revoke_family_is_scoped_to_user_and_device(store):
+    user_id, other_user = str(uuid.uuid4()), str(uuid.uuid4())
+    await store.add(_token(user_id, "d1"), _digest("d1-a"))
+    await store.add(_token(user_id, "d1"), _digest("d1-b"))
+    await store.add(_token(user_id, "d2"), _digest("d2"))
+    await store.add(_token(other_user, "d1"), _digest("other"))
+    now = datetime.now(timezone.utc)
+
+    assert await store.revoke_family(user_id, "d1", now) == 2
+    assert await store.revoke_family(user_id, "d1", now) == 0
+
+    assert (await store.get(_digest("d1-a"))).revoked is True
+    assert (await store.get(_digest("d1-b"))).revoked is True
+    assert (await store.get(_digest("d2"))).revoked is False
+    assert (await store.get(_digest("other"))).revoked is False
+    assert await store.revoke_family(user_id, None, now) == 1
+
+
+async def test_purge_is_a_logged_no_op(db, store, caplog):
+    service = TokenService(db, store=store)
+
+    with caplog.at_level(logging.WARNING, logger="TokenService"):
+        report = await service.purge(retention=timedelta(hours=1))
+
+    assert (report.removed, report.batches) == (0, 0)
+    assert "token_store=kv" in caplog.text
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.config.logger import JsonFormatter, LoggerConfig, NonBlockingQueueHandler
+from src.middleware.request_id_middleware import RequestIdMiddleware
+
+
+def _enqueue(handler: NonBlockingQueueHandler, record: logging.LogRecord) -> logging.LogRecord:
+    handler.handle(record)
+    return handler.queue.get_nowait()
+
+
+def test_queued_record_captures_args_at_call_time():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    state = {"count": 1}
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "state=%s", (state,), None)
+
+    queued = _enqueue(handler, record)
+    state["count"] = 2
+
+    assert queued.getMessage() == "state={'count': 1}"
+    assert queued.args is None
+
+
+def test_queued_record_keeps_traceback_text_and_extra_fields():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = logging.getLogger("test").makeRecord(
+            "test", logging.ERROR, __file__, 1, "failed", (), sys.exc_info(),
+            extra={"user_id": "u1"},
+        )
+
+    queued = _enqueue(handler, record)
+    payload = json.loads(JsonFormatter().format(queued))
+
+    assert queued.exc_info is None
+    assert "RuntimeError: boom" in payload["exception"]
+    assert payload["user_id"] == "u1"
+    assert payload["message"] == "failed"
+
+
+@pytest.fixture
+def request_log():
+    stream = io.StringIO()
+    config = LoggerConfig(handler=logging.StreamHandler(stream))
+    logger = logging.getLogger("test.request_id")
+    logger.addHandler(config.root_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        logger.info("pong")
+        return {}
+
+    yield TestClient(app), stream
+    logger.removeHandler(config.root_handler)
+    logger.propagate = True
+
+
+def test_request_id_header_matches_the_logged_request_id(request_log):
+    client, stream = request_log
+
+    echoed = client.get("/ping", headers={"x-request-id": "abc-123"})
+    generated = client.get("/ping", headers={"x-request-id": "not valid!"})
+    logging.getLogger("test.request_id").info("outside")
+
+    lines = stream.getvalue().splitlines()
+    assert echoed.headers["x-request-id"] == "abc-123"
+    assert generated.headers["x-request-id"] not in ("", "not valid!")
+    assert lines[0].endswith("| abc-123 | pong")
+    assert lines[1].endswith(f"| {generated.headers['x-request-id']} | pong")
+    assert lines[2].endswith("| - | outside")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import pytest
+
+from src.exceptions.auth.auth_exceptions import LoginThrottledException
+from src.utils import login_limiter as limiter_module
+from src.utils.login_limiter import BucketPolicy, LoginLimiter, MemoryLimiterBackend
+
+pytestmark = pytest.mark.anyio
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(limiter_module.time, "time", clock)
+    return clock
+
+
+def _limiter(**kwargs) -> LoginLimiter:
+    options = {
+        "username_policy": BucketPolicy(per_minute=600, burst=50),
+        "ip_policy": BucketPolicy(per_minute=600, burst=50),
+        "backoff_after_failures": 3,
+        "backoff_base_seconds": 2.0,
+        "backoff_max_seconds": 60.0,
+        "failure_window_seconds": 900.0,
+    }
+    options.update(kwargs)
+    return LoginLimiter(MemoryLimiterBackend(), **options)
+
+
+async def _retry_after(limiter: LoginLimiter, username, ip) -> int:
+    with pytest.raises(LoginThrottledException) as exc_info:
+        await limiter.check(username, ip)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["Retry-After"] == str(exc_info.value.retry_after)
+    return exc_info.value.retry_after
+
+
+async def test_empty_bucket_is_throttled_with_retry_after(clock):
+    limiter = _limiter(username_policy=BucketPolicy(per_minute=6, burst=2))
+
+    await limiter.check("alice", None)
+    await limiter.check("alice", None)
+
+    assert await _retry_after(limiter, "alice", None) == 10
+    clock.now += 10
+    await limiter.check("alice", None)
+    assert limiter.stats()["rejected_username"] == 1
+
+
+async def test_backoff_doubles_per_failure_and_is_capped(clock):
+    limiter = _limiter()
+
+    for _ in range(2):
+        await limiter.record_failure("alice", None)
+    await limiter.check("alice", None)
+
+    delays = []
+    for _ in range(6):
+        await limiter.record_failure("alice", None)
+        delays.append(await _retry_after(limiter, "alice", None))
+    assert delays == [2, 4, 8, 16, 32, 60]
+
+
+async def test_success_resets_username_backoff_but_not_ip(clock):
+    limiter = _limiter()
+
+    for _ in range(4):
+        await limiter.record_failure("alice", "10.0.0.1")
+    await _retry_after(limiter, "alice", None)
+    await _retry_after(limiter, None, "10.0.0.1")
+
+    await limiter.record_success("alice", "10.0.0.1")
+
+    await limiter.check("alice", None)
+    await _retry_after(limiter, None, "10.0.0.1")
+
+
+async def test_failures_decay_after_a_quiet_period(clock):
+    limiter = _limiter()
+
+    for _ in range(2):
+        await limiter.record_failure("alice", None)
+    clock.now += 900
+    await limiter.record_failure("alice", None)
+
+    await limiter.check("alice", None)
+
+
+async def test_occasional_failures_behind_shared_ip_never_throttle(clock):
+    # One mistyped password every ten minutes from a NAT gateway.
+    limiter = _limiter(backoff_after_failures=5)
+
+    for _ in range(36):
+        await limiter.record_failure(None, "203.0.113.7")
+        clock.now += 600
+        await limiter.check(None, "203.0.113.7")
+    assert limiter.stats()["rejected_ip"] == 0
+
+
+async def test_login_route_returns_429_with_retry_after(client, admin_user, monkeypatch):
+    monkeypatch.setattr(
+        limiter_module.get_login_limiter(), "policies",
+        {"username": BucketPolicy(per_minute=1, burst=1), "ip": BucketPolicy(per_minute=0, burst=1)},
+    )
+    credentials = {"username": admin_user.username, "password": "wrong-password"}
+
+    assert client.post("/api/v1/auth/login", data=credentials).status_code == 401
+    response = client.post("/api/v1/auth/login", data=credentials)
+
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.config.settings import get_settings
+from src.metrics.instruments import HTTP_REQUESTS
+from src.middleware.metrics_middleware import MetricsMiddleware
+from src.metrics.registry import (
+    MetricsRegistry,
+    read_snapshots,
+    remove_snapshot,
+    render_text,
+    write_snapshot,
+)
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_read_snapshots_drops_files_of_dead_workers(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.").inc()
+    write_snapshot(str(tmp_path), registry.snapshot())
+    stale = tmp_path / f"metrics-{_dead_pid()}.json"
+    stale.write_text(json.dumps(registry.snapshot()))
+
+    snapshots = read_snapshots(str(tmp_path))
+
+    assert len(snapshots) == 1
+    assert not stale.exists()
+
+
+def test_remove_snapshot_deletes_own_file(tmp_path):
+    write_snapshot(str(tmp_path), MetricsRegistry().snapshot())
+    remove_snapshot(str(tmp_path))
+    remove_snapshot(str(tmp_path))
+
+    assert not (tmp_path / f"metrics-{os.getpid()}.json").exists()
+
+
+def test_render_text_follows_the_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    requests.inc('/say "hi"')
+    requests.inc('/say "hi"', amount=2)
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    assert render_text(registry.snapshot()) == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3\n"
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/say \\"hi\\""} 3\n'
+    )
+
+
+def _request_counts():
+    return {tuple(labels): value for labels, value in HTTP_REQUESTS.snapshot()["samples"]}
+
+
+def test_http_metrics_are_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    before = _request_counts()
+    client = TestClient(app)
+    for item_id in (1, 2, 3):
+        client.get(f"/items/{item_id}")
+    client.get("/nowhere/7")
+    after = _request_counts()
+
+    def delta(*labels):
+        return after.get(labels, 0) - before.get(labels, 0)
+
+    assert delta("GET", "/items/{item_id}", "200") == 3
+    assert delta("GET", "unmatched", "404") == 1
+    assert not [labels for labels in after if labels[1].startswith(("/items/1", "/nowhere"))]
+
+
+def test_metrics_endpoint_requires_the_configured_bearer_token(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "metrics_enabled", True)
+    monkeypatch.setattr(get_settings(), "metrics_bearer_token", "scrape-secret")
+
+    denied = client.get("/metrics")
+    wrong = client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    allowed = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert (denied.status_code, wrong.status_code) == (401, 401)
+    assert denied.headers["WWW-Authenticate"] == "Bearer"
+    assert allowed.status_code == 200
+    assert allowed.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_requests_total counter" in allowed.text
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+
+import anyio
+import pytest
+
+from src.exceptions.auth.auth_exceptions import PasswordHashingOverloadedException
+from src.utils.password_hasher import PasswordHashingPool, get_password_hashing_pool
+
+pytestmark = pytest.mark.anyio
+
+
+class _BlockingManager:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def hash(self, password: str) -> str:
+        self.started.release()
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+
+async def test_pool_sheds_work_beyond_workers_plus_pending():
+    manager = _BlockingManager()
+    pool = PasswordHashingPool(manager, max_workers=1, max_pending=1)
+    results = []
+
+    async def hash_one(password):
+        results.append(await pool.hash(password))
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(hash_one, "a")
+            tg.start_soon(hash_one, "b")
+            await anyio.to_thread.run_sync(manager.started.acquire)
+            assert pool.in_flight == 2
+
+            with pytest.raises(PasswordHashingOverloadedException):
+                await pool.hash("c")
+            assert pool.rejected == 1
+            manager.release.set()
+
+        assert sorted(results) == ["hashed:a", "hashed:b"]
+        assert pool.in_flight == 0
+        assert await pool.hash("d") == "hashed:d"
+    finally:
+        manager.release.set()
+        pool.shutdown()
+
+
+def test_login_returns_503_when_the_pool_is_saturated(client, admin_user, monkeypatch):
+    pool = get_password_hashing_pool()
+    monkeypatch.setattr(pool, "_in_flight", pool.max_workers + pool.max_pending)
+
+    response = client.post(
+        "/api/v1/auth/login", data={"username": admin_user.username, "password": "password123"}
+    )
+
+    assert response.status_code == 503
+    assert response.json()["error"] == "Service temporarily overloaded"
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.config.settings import get_engine
+from src.metrics.sql_instrumentation import instrument_engine
+from src.middleware.query_stats_middleware import QueryStatsMiddleware
+from src.services.token_service import TokenService
+
+
+@pytest.mark.anyio
+@pytest.mark.max_queries(5)
+async def test_create_and_rotate_query_budget(query_stats, db):
+    # create: INSERT + refresh SELECT; rotate: lookup, claim UPDATE, INSERT.
+    service = TokenService(db)
+    raw = await service.create_refresh_token(user_id=str(uuid.uuid4()))
+    await service.rotate(raw)
+
+
+def _app() -> FastAPI:
+    instrument_engine(get_engine())
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, debug_headers=True)
+
+    def run_query() -> None:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1")).all()
+
+    @app.get("/plain")
+    def plain():
+        run_query()
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        def body():
+            for _ in range(2):
+                run_query()
+                yield b"row\n"
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    return app
+
+
+def test_debug_headers_report_buffered_responses():
+    with TestClient(_app()) as client:
+        response = client.get("/plain")
+    assert response.headers["x-db-query-count"] == "1"
+
+
+def test_debug_headers_are_omitted_for_streamed_responses():
+    with TestClient(_app()) as client:
+        response = client.get("/stream")
+    assert response.text == "row\nrow\n"
+    assert "x-db-query-count" not in response.headers
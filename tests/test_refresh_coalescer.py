@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.utils import refresh_coalescer
+from src.utils.refresh_coalescer import RefreshCoalescer
+
+pytestmark = pytest.mark.anyio
+
+
+class _Rotation:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"new-{self.calls}", "user-1"
+
+
+async def test_concurrent_refreshes_share_one_rotation():
+    coalescer = RefreshCoalescer(grace_seconds=10)
+    rotation = _Rotation()
+
+    tasks = [asyncio.create_task(coalescer.run("key", rotation)) for _ in range(3)]
+    await asyncio.sleep(0)
+    rotation.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert rotation.calls == 1
+    assert results == [("new-1", "user-1")] * 3
+    assert coalescer.coalesced == 2
+
+
+async def test_rotation_error_reaches_every_waiter():
+    coalescer = RefreshCoalescer(grace_seconds=10)
+    rotation = _Rotation(error=ValueError("refresh token invalid"))
+
+    tasks = [asyncio.create_task(coalescer.run("key", rotation)) for _ in range(3)]
+    await asyncio.sleep(0)
+    rotation.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert rotation.calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    # A failed rotation is not remembered.
+    rotation.error = None
+    assert await coalescer.run("key", rotation) == ("new-2", "user-1")
+
+
+async def test_recent_result_expires_after_grace(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(refresh_coalescer.time, "monotonic", lambda: now[0])
+    coalescer = RefreshCoalescer(grace_seconds=10)
+    rotation = _Rotation()
+    rotation.release.set()
+
+    assert await coalescer.run("key", rotation) == ("new-1", "user-1")
+    now[0] += 5
+    assert await coalescer.run("key", rotation) == ("new-1", "user-1")
+    now[0] += 6
+    assert await coalescer.run("key", rotation) == ("new-2", "user-1")
+    assert rotation.calls == 2
+
+
+async def test_recent_result_is_not_served_once_revoked():
+    coalescer = RefreshCoalescer(grace_seconds=10)
+    rotation = _Rotation()
+    rotation.release.set()
+    live = {"value": True}
+
+    async def revalidate(result):
+        return live["value"]
+
+    await coalescer.run("key", rotation, revalidate)
+    assert await coalescer.run("key", rotation, revalidate) == ("new-1", "user-1")
+    live["value"] = False
+    assert await coalescer.run("key", rotation, revalidate) == ("new-2", "user-1")
+    assert rotation.calls == 2
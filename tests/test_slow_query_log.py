@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, text
+
+from src.metrics.slow_query_log import SlowQueryLog
+from src.metrics.sql_instrumentation import instrument_engine, track_queries
+
+
+def _engine(slow_log: SlowQueryLog):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    slow_log.attach(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')"))
+    slow_log.clear()
+    return engine
+
+
+def test_slow_query_is_recorded_with_redacted_parameters_and_plan():
+    slow_log = SlowQueryLog(threshold_ms=1e-6, explain=True)
+    engine = _engine(slow_log)
+
+    with track_queries() as stats, engine.connect() as conn:
+        conn.execute(text("SELECT * FROM items WHERE name = :name"), {"name": "secret"}).all()
+
+    entry = slow_log.entries()[0]
+    assert entry.parameters == ["<str>"]
+    assert entry.explain
+    assert entry.explain_error is None
+    # The EXPLAIN itself is neither logged as slow nor counted per request.
+    assert len(slow_log.entries()) == 1
+    assert stats.count == 1
+
+
+def test_streamed_statement_is_not_explained():
+    slow_log = SlowQueryLog(threshold_ms=1e-6, explain=True)
+    engine = _engine(slow_log)
+
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=1).execute(text("SELECT * FROM items"))
+        assert len(result.all()) == 3
+
+    entry = slow_log.entries()[0]
+    assert entry.explain is None
+    assert entry.explain_error is None
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+import uuid
+
+import pytest
+
+from src.services.token_service import TokenService
+from src.utils.token_filter import BloomFilter, RefreshTokenFilter
+
+
+def _digests(count: int):
+    return [os.urandom(32) for _ in range(count)]
+
+
+def test_filter_rotates_instead_of_overfilling():
+    token_filter = RefreshTokenFilter(capacity=100, error_rate=0.01)
+    revoked = _digests(500)
+    for digest in revoked:
+        token_filter.add_revoked(digest)
+
+    stats = token_filter.stats()
+    assert stats["revoked_rotations"] == 4
+    assert stats["revoked_entries"] <= 200
+    # The two most recent generations are still covered.
+    assert all(token_filter.may_be_revoked(digest) for digest in revoked[-100:])
+    false_positives = sum(token_filter.may_be_revoked(digest) for digest in _digests(2000))
+    assert false_positives / 2000 < 0.05
+
+
+def test_rebuild_replaces_all_generations():
+    token_filter = RefreshTokenFilter(capacity=10)
+    stale = _digests(25)
+    for digest in stale:
+        token_filter.add_revoked(digest)
+    fresh = _digests(3)
+
+    assert token_filter.rebuild(fresh) == 3
+
+    assert all(token_filter.may_be_revoked(digest) for digest in fresh)
+    assert token_filter.stats()["revoked_entries"] == 3
+
+
+def test_missing_cache_expires():
+    token_filter = RefreshTokenFilter(missing_ttl_seconds=-1)
+    digest = os.urandom(32)
+    token_filter.add_missing(digest)
+    assert not token_filter.is_known_missing(digest)
+
+    token_filter = RefreshTokenFilter(missing_ttl_seconds=60)
+    token_filter.add_missing(digest)
+    assert token_filter.is_known_missing(digest)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    digests = _digests(1000)
+    for digest in digests:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests)
+
+
+@pytest.mark.anyio
+async def test_filter_hit_on_a_live_token_is_confirmed_by_the_database(db):
+    service = TokenService(db)
+    raw = await service.create_refresh_token(user_id=str(uuid.uuid4()))
+    # Simulate a false positive: the digest matches the filter, the row is live.
+    service.token_filter.add_revoked(service.digest_raw(raw))
+
+    token = await service.lookup_by_raw(raw)
+
+    assert token is not None
+    assert service.token_filter.stats()["revoked_false_positives"] == 1
+
+
+@pytest.mark.anyio
+async def test_filter_hit_on_a_revoked_token_is_rejected(db):
+    service = TokenService(db)
+    user_id = str(uuid.uuid4())
+    raw = await service.create_refresh_token(user_id=user_id, device_id="d1")
+    await service.revoke_all_for_user_and_device(user_id, "d1")
+    service.mark_revoked(raw)
+
+    assert await service.lookup_by_raw(raw) is None
+    assert service.token_filter.stats()["revoked_hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_rebuild_filter_loads_revoked_families(db):
+    service = TokenService(db)
+    user_id = str(uuid.uuid4())
+    revoked = await service.create_refresh_token(user_id=user_id, device_id="d1")
+    live = await service.create_refresh_token(user_id=user_id, device_id="d2")
+    await service.revoke_all_for_user_and_device(user_id, "d1")
+
+    assert await service.rebuild_filter() == 1
+
+    assert service.token_filter.may_be_revoked(service.digest_raw(revoked))
+    assert await service.lookup_by_raw(live) is not None
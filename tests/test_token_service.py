@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from src.config.settings import get_settings
+from src.models.refresh_token import RefreshToken
+from src.services.token_service import TokenService
+from src.stores.token.sql_token_store import SqlTokenStore
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_rotate_replaces_token(db):
+    service = TokenService(db)
+    user_id = str(uuid.uuid4())
+    raw = await service.create_refresh_token(user_id=user_id, device_id="d1")
+
+    new_raw, rotated_user = await service.rotate(raw)
+
+    assert rotated_user == user_id
+    assert new_raw != raw
+    with pytest.raises(ValueError, match="refresh token invalid"):
+        await service.rotate(raw)
+
+
+async def test_concurrent_double_rotation_revokes_family(session_factory):
+    user_id = str(uuid.uuid4())
+    async with session_factory() as db:
+        raw = await TokenService(db).create_refresh_token(user_id=user_id, device_id="d1")
+
+    async with session_factory() as first_db, session_factory() as second_db:
+        first, second = TokenService(first_db), TokenService(second_db)
+        first_token = await first.lookup_by_raw(raw)
+        second_token = await second.lookup_by_raw(raw)
+        results = await asyncio.gather(
+            first.rotate(raw, token=first_token),
+            second.rotate(raw, token=second_token),
+            return_exceptions=True,
+        )
+
+    rotated = [r for r in results if isinstance(r, tuple)]
+    rejected = [r for r in results if isinstance(r, BaseException)]
+    assert len(rotated) == 1
+    assert len(rejected) == 1
+    assert isinstance(rejected[0], ValueError), repr(rejected[0])
+    assert str(rejected[0]) == "refresh token invalid"
+
+    async with session_factory() as db:
+        rows = (await db.execute(select(RefreshToken))).scalars().all()
+    assert len(rows) == 2
+    assert all(row.revoked for row in rows)
+
+
+async def test_binary_store_reads_legacy_hex_hash_until_disabled(db, monkeypatch):
+    service = TokenService(db)
+    raw = await service.create_refresh_token(user_id=str(uuid.uuid4()))
+    digest = service.digest_raw(raw)
+
+    monkeypatch.setattr(get_settings(), "token_hash_storage", "binary")
+    assert (await SqlTokenStore(db).get(digest)) is not None
+
+    monkeypatch.setattr(get_settings(), "token_hash_legacy_read", False)
+    assert (await SqlTokenStore(db).get(digest)) is None
+
+
+async def test_purge_removes_expired_and_long_revoked_tokens(db):
+    service = TokenService(db)
+    user_id = str(uuid.uuid4())
+    expired, revoked, live = [
+        await service.create_refresh_token(user_id=user_id, device_id=f"d{i}") for i in range(3)
+    ]
+    long_ago = datetime.now(timezone.utc) - timedelta(days=3)
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == service.hash_raw(expired))
+        .values(expires_at=long_ago)
+    )
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == service.hash_raw(revoked))
+        .values(revoked=True, rotated_at=long_ago)
+    )
+    await db.commit()
+
+    report = await service.purge(timedelta(days=1), batch_size=1, pause_seconds=0)
+
+    assert report.removed == 2
+    remaining = (await db.execute(select(RefreshToken.token_hash))).scalars().all()
+    assert remaining == [service.hash_raw(live)]
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from src.config.settings import get_async_engine, get_engine, get_sessionmaker, get_settings
+from src.exceptions.auth.auth_exceptions import PasswordHashingOverloadedException
+from src.metrics.sql_instrumentation import count_queries
+from src.models.user import User
+from src.services.user_service import EXPORT_CSV_COLUMNS, UserService
+from src.utils.password import PasswordManager
+from src.utils.password_hasher import get_password_hashing_pool
+from src.utils.principal_cache import get_principal_cache
+from tests.conftest import ADMIN_PASSWORD, seed_users, valid_cpf
+
+
+def _list_users_queries(client, headers, limit: int) -> int:
+    with count_queries(get_engine(), get_async_engine().sync_engine) as stats:
+        response = client.get(f"/api/v1/users/?limit={limit}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["items"]) == limit
+    return stats.count
+
+
+def test_list_users_query_count_is_independent_of_page_size(client, admin_headers):
+    # A distinct role per user, so lazy role loads could not be served
+    # from the identity map.
+    seed_users(20, own_roles=True)
+
+    small = _list_users_queries(client, admin_headers, limit=2)
+    large = _list_users_queries(client, admin_headers, limit=20)
+
+    assert small == large == 1
+
+
+def test_list_users_includes_role(client, admin_headers, admin_user):
+    seed_users(3, role_id=admin_user.role_id)
+
+    response = client.get("/api/v1/users/?limit=10", headers=admin_headers)
+
+    assert {item["role"]["name"] for item in response.json()["items"]} == {"admin"}
+
+
+def test_write_routes_reuse_the_cached_principal(client, admin_headers):
+    cache = get_principal_cache()
+    hits = cache.stats()["hits"]
+
+    for name in ("editor", "viewer"):
+        response = client.post("/api/v1/roles/", json={"name": name, "description": name}, headers=admin_headers)
+        assert response.status_code == 201, response.text
+
+    assert cache.stats()["hits"] == hits + 1
+
+
+def test_demoted_admin_loses_write_access_before_token_expiry(client, admin_headers, admin_user):
+    (other_id,) = seed_users(1, role_id=admin_user.role_id, prefix="other")
+    session = get_sessionmaker()()
+    try:
+        session.get(User, other_id).password_hash = PasswordManager().hash(ADMIN_PASSWORD)
+        session.commit()
+    finally:
+        session.close()
+    login = client.post("/api/v1/auth/login", data={"username": "other0", "password": ADMIN_PASSWORD})
+    other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.post("/api/v1/roles/", json={"name": "editor", "description": "e"}, headers=other_headers).status_code == 201
+    roles = client.get("/api/v1/roles/", headers=admin_headers).json()["items"]
+
+    editor = next(role for role in roles if role["name"] == "editor")
+    response = client.patch(f"/api/v1/users/{other_id}", json={"role_id": editor["id"]}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/v1/roles/", json={"name": "viewer", "description": "v"}, headers=other_headers)
+    assert response.status_code == 403
+
+
+def _import_rows(count: int):
+    return [
+        {
+            "name": f"Imported {i}",
+            "username": f"imported{i}",
+            "email": f"imported{i}@example.com",
+            "password": "password123",
+            "cpf": valid_cpf(100000000 + i),
+            "birthday": "1990-01-01",
+        }
+        for i in range(count)
+    ]
+
+
+def test_import_reports_committed_rows_when_a_later_batch_fails(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(get_settings(), "user_import_batch_size", 2)
+    pool = get_password_hashing_pool()
+    hash_many = pool.hash_many
+    calls = []
+
+    async def flaky_hash_many(passwords):
+        calls.append(len(passwords))
+        if len(calls) == 2:
+            raise PasswordHashingOverloadedException()
+        return await hash_many(passwords)
+
+    monkeypatch.setattr(pool, "hash_many", flaky_hash_many)
+
+    response = client.post("/api/v1/users/import", json=_import_rows(5), headers=admin_headers)
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["aborted"] is True
+    assert report["error"] == "Service temporarily overloaded"
+    assert (report["created"], report["failed"], report["skipped"]) == (2, 0, 3)
+    assert [row["status"] for row in report["results"]] == ["created"] * 2 + ["skipped"] * 3
+    listed = client.get("/api/v1/users/?limit=50", headers=admin_headers).json()["items"]
+    assert {user["username"] for user in listed} >= {"imported0", "imported1"}
+    assert "imported2" not in {user["username"] for user in listed}
+
+
+def test_import_detects_case_variant_duplicates_and_conflicts(client, admin_headers):
+    seed_users(1, prefix="bob")
+    rows = _import_rows(3)
+    rows[0]["email"] = "Bob0@Example.com"
+    rows[2]["username"] = "IMPORTED1"
+
+    response = client.post("/api/v1/users/import", json=rows, headers=admin_headers)
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [row["status"] for row in results] == ["failed", "created", "failed"]
+    assert results[0]["error"].startswith("User with email 'Bob0@")
+    assert results[2]["error"] == "User with username 'IMPORTED1' already exists"
+
+
+def test_keyset_pages_cover_every_user_once_in_order(client, admin_headers):
+    seed_users(23)
+    # Shared timestamps force the id tie-breaker to carry the cursor.
+    with get_engine().begin() as conn:
+        conn.execute(update(User).where(User.username.in_([f"user{i}" for i in range(10)])).values(
+            created_at=datetime(2020, 1, 1)
+        ))
+
+    pages, cursor = [], None
+    while True:
+        url = "/api/v1/users/?limit=5" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=admin_headers).json()
+        pages.append([user["id"] for user in body["items"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    seen = [user_id for page in pages for user_id in page]
+    with get_engine().connect() as conn:
+        expected = conn.execute(
+            User.__table__.select().with_only_columns(User.id).order_by(User.created_at, User.id)
+        ).scalars().all()
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 4]
+    assert seen == expected
+    assert len(set(seen)) == 24
+
+
+def test_invalid_cursor_is_rejected(client, admin_headers):
+    for cursor in ("not-a-cursor", "WyJ4Il0", "bm90IGpzb24"):
+        response = client.get(f"/api/v1/users/?cursor={cursor}", headers=admin_headers)
+
+        assert response.status_code == 400, cursor
+        assert response.json()["error"] == "Invalid pagination cursor"
+
+
+def test_export_streams_every_user_as_ndjson_and_csv(client, admin_headers, admin_user):
+    seed_users(12)
+
+    ndjson = client.get("/api/v1/users/export", headers=admin_headers)
+    csv_response = client.get("/api/v1/users/export?format=csv", headers=admin_headers)
+
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert ndjson.headers["content-disposition"] == 'attachment; filename="users.ndjson"'
+    records = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert len(records) == 13
+    assert records[0]["role"]["name"] == "admin"
+    assert all("password_hash" not in record for record in records)
+
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(csv_response.text)))
+    assert rows[0] == EXPORT_CSV_COLUMNS
+    assert [row[0] for row in rows[1:]] == [record["id"] for record in records]
+    assert rows[1][EXPORT_CSV_COLUMNS.index("role_name")] == "admin"
+
+
+@pytest.mark.anyio
+async def test_export_yields_one_chunk_per_batch(db):
+    seed_users(25)
+
+    chunks = [chunk async for chunk in UserService(db).export_ndjson(batch_size=10)]
+
+    assert [chunk.count("\n") for chunk in chunks] == [10, 10, 5]
+    assert not [obj for obj in db.identity_map.values() if isinstance(obj, User)]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from src.config.settings import get_async_engine
+from src.exceptions.users.user_exceptions import UserAlreadyExistsException
+from src.metrics.sql_instrumentation import count_queries
+from src.schemas.auth.principal_schema import PrincipalSchema
+from src.schemas.user.user_create_schema import UserCreateSchema
+from src.services.user_service import UserService
+from tests.conftest import seed_users, valid_cpf
+
+pytestmark = pytest.mark.anyio
+
+ADMIN = PrincipalSchema(id="admin", username="admin", role="admin")
+
+
+def _user_in(**overrides) -> UserCreateSchema:
+    values = {
+        "name": "New User",
+        "username": "newuser",
+        "email": "newuser@example.com",
+        "password": "password123",
+        "cpf": valid_cpf(123456789),
+        "birthday": date(1990, 1, 1),
+    }
+    values.update(overrides)
+    return UserCreateSchema(**values)
+
+
+def _user_selects(stats) -> int:
+    return sum(
+        count for sql, count in stats.statements.items()
+        if sql.lstrip().upper().startswith("SELECT") and "FROM users" in sql
+    )
+
+
+@pytest.mark.parametrize(
+    ("overrides", "field"),
+    [({"username": "user1"}, "username"), ({"email": "user1@example.com"}, "email")],
+)
+async def test_create_checks_all_unique_fields_in_one_query(db, overrides, field):
+    seed_users(3)
+    service = UserService(db)
+
+    with count_queries(get_async_engine().sync_engine) as stats:
+        with pytest.raises(UserAlreadyExistsException) as exc_info:
+            await service.create(user_in=_user_in(**overrides), current_user=ADMIN)
+
+    assert f"User with {field} " in exc_info.value.message
+    assert _user_selects(stats) == 1
+    assert stats.count == 1
+
+
+async def test_create_maps_a_lost_insert_race_to_user_already_exists(db, monkeypatch):
+    seed_users(1)
+    service = UserService(db)
+    find_conflict = service._find_conflict
+    calls = []
+
+    async def racing_find_conflict(**values):
+        # The pre-check runs before the competing insert commits.
+        calls.append(values)
+        return None if len(calls) == 1 else await find_conflict(**values)
+
+    monkeypatch.setattr(service, "_find_conflict", racing_find_conflict)
+
+    with pytest.raises(UserAlreadyExistsException) as exc_info:
+        await service.create(user_in=_user_in(username="user0"), current_user=ADMIN)
+
+    assert exc_info.value.message == "User with username 'user0' already exists"
+    assert len(calls) == 2
+    users, _ = await service.list(limit=10)
+    assert [user.username for user in users] == ["user0"]